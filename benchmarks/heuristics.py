@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Compares the loop heuristic with the vectorized one on board files."""
+import argparse
+import glob
+import time
+
+from gomoku.board import Board
+from gomoku.heuristics import heuristic, vectorized_heuristic
+
+
+def timeit(function, repeat, *args):
+  """Returns the result of `function(*args)` and its mean running time."""
+  start = time.time()
+  for _ in range(repeat):
+    result = function(*args)
+  return result, (time.time() - start) / repeat
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/evals/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-r', '--repeat', type=int, default=10,
+                      help="Number of evaluations per board.")
+  args = parser.parse_args()
+
+  total_loop = total_vectorized = 0
+  print(f"{'board':<40} {'loop (ms)':>10} {'numpy (ms)':>10} {'speedup':>8}")
+  for filename in args.boards:
+    position = Board(filename).board
+    (loop_score, _), loop_time = timeit(heuristic, args.repeat, position, 1,
+                                        True)
+    (vect_score, _), vect_time = timeit(vectorized_heuristic, args.repeat,
+                                        position, 1, True)
+    assert loop_score == vect_score, f"{filename}: {loop_score} {vect_score}"
+    total_loop += loop_time
+    total_vectorized += vect_time
+    print(f"{filename:<40} {loop_time * 1e3:>10.3f} {vect_time * 1e3:>10.3f} "
+          f"{loop_time / vect_time:>7.1f}x")
+  print(f"{'total':<40} {total_loop * 1e3:>10.3f} "
+        f"{total_vectorized * 1e3:>10.3f} "
+        f"{total_loop / total_vectorized:>7.1f}x")
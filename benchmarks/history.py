@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Compares the nodes searched with and without killer moves and history
+scores, at fixed depth, on board files, with and without move ordering."""
+import argparse
+import glob
+import time
+
+from ordering import game_handler
+
+
+def search(filename, algorithm, move_ordering, use_history, depth):
+  """Returns the nodes searched by iterative deepening up to `depth` on the
+  board in `filename`, from the best moves of the agent to move."""
+  gh, agent = game_handler(filename, algorithm, move_ordering)
+  agent.gh, agent.start, agent.use_history = gh, time.time(), use_history
+  agent.new_search()
+  moves = agent.children(agent.color, agent.max_top_moves)
+  for agent.root_depth in range(1, depth + 1):
+    for move in moves:
+      agent.minimaximizer(move, agent.root_depth)
+  return agent.nodes_searched
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/evals/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-a', '--algorithm', type=str, default='alpha_beta',
+                      help="Minimax flavour (not mtdf, which is timed).")
+  parser.add_argument('-D', '--depth', type=int, default=2,
+                      help="Depth of the last iteration.")
+  parser.add_argument('--no-ordering', action='store_true',
+                      help="Compare without move ordering (recent first).")
+  args = parser.parse_args()
+
+  total_before = total_after = 0
+  print(f"{'board':<45} {'before':>8} {'after':>8} {'ratio':>6}")
+  for filename in args.boards:
+    before, after = (search(filename, args.algorithm, not args.no_ordering,
+                            use_history, args.depth)
+                     for use_history in [False, True])
+    total_before, total_after = total_before + before, total_after + after
+    print(f"{filename:<45} {before:>8} {after:>8} "
+          f"{after / max(before, 1):>6.2f}")
+  print(f"{'total':<45} {total_before:>8} {total_after:>8} "
+        f"{total_after / max(total_before, 1):>6.2f}")
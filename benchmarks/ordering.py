@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Compares the searches with and without move ordering on board files."""
+import argparse
+import glob
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.minimax import minimax_agent_wrapper
+
+
+def game_handler(filename, algorithm, move_ordering):
+  """Game handler of the board in `filename`, the agent being the player to
+  move (the one with fewer stones, black on equality)."""
+  board = Board(filename)
+  to_move = 1 if (board.board == 1).sum() <= (board.board == 2).sum() else 2
+  players = [minimax_agent_wrapper(algorithm)(color) for color in [1, 2]]
+  for player in players:
+    player.depth = 10
+    player.move_ordering = move_ordering
+  gh = GameHandler(board, players)
+  gh.current = to_move - 1
+  gh.hash = gh.zobrist.hash(board, gh.current, gh.get_player_captures())
+  return gh, players[to_move - 1]
+
+
+def search(filename, algorithm, move_ordering):
+  """Returns the depth reached, the nodes searched and the cutoffs made by the
+  agent to move on the board in `filename` (after a first search warming up
+  the pattern caches)."""
+  for _ in range(2):
+    gh, agent = game_handler(filename, algorithm, move_ordering)
+    agent.find_move(gh)
+  return agent.ite_deep_depth, agent.nodes_searched, agent.cutoffs
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/expert/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-a', '--algorithm', type=str, default='alpha_beta',
+                      help="Minimax flavour.")
+  args = parser.parse_args()
+
+  print(f"{'board':<34} {'ordering':>8} {'depth':>5} {'nodes':>7} "
+        f"{'cutoffs/node':>12}")
+  for filename in args.boards:
+    for move_ordering in [False, True]:
+      depth, nodes, cutoffs = search(filename, args.algorithm, move_ordering)
+      print(f"{filename:<34} {str(move_ordering):>8} {depth:>5} {nodes:>7} "
+            f"{cutoffs / max(nodes, 1):>12.3f}")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Compares the depth reached, the nodes searched and the moves found with and
+without null-move pruning and late move reductions on board files."""
+import argparse
+import glob
+
+from ordering import game_handler
+
+CONFIGS = {
+  'none': (False, False),
+  'null': (True, False),
+  'lmr': (False, True),
+  'both': (True, True),
+}
+
+
+def search(filename, algorithm, null_move, late_move_reductions):
+  """Returns the depth reached, the nodes searched and the move found by the
+  agent to move on the board in `filename` (after a first search warming up
+  the pattern caches)."""
+  for _ in range(2):
+    gh, agent = game_handler(filename, algorithm, True)
+    agent.null_move = null_move
+    agent.late_move_reductions = late_move_reductions
+    move = agent.find_move(gh)
+  return agent.ite_deep_depth, agent.nodes_searched, move
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/evals/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-a', '--algorithm', type=str, default='alpha_beta',
+                      help="Minimax flavour (alpha_beta, alpha_beta_memory "
+                      "or pvs).")
+  args = parser.parse_args()
+
+  depths = {config: 0 for config in CONFIGS}
+  same_moves = {config: 0 for config in CONFIGS}
+  print(f"{'board':<45} " + " ".join(f"{config:>16}" for config in CONFIGS))
+  for filename in args.boards:
+    results = {config: search(filename, args.algorithm, *CONFIGS[config])
+               for config in CONFIGS}
+    for config, (depth, nodes, move) in results.items():
+      depths[config] += depth
+      same_moves[config] += move == results['none'][2]
+    print(f"{filename:<45} " + " ".join(
+        f"{depth:>2} {nodes:>6} {str(tuple(map(int, move))):>6}"
+        for depth, nodes, move in results.values()))
+  print(f"{'mean depth':<45} " + " ".join(
+      f"{depths[config] / len(args.boards):>16.2f}" for config in CONFIGS))
+  print(f"{'same move as none':<45} " + " ".join(
+      f"{same_moves[config]:>16}" for config in CONFIGS))
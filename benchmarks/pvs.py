@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Compares the nodes per second and the depth reached by pvs and mtdf on board
+files."""
+import argparse
+import glob
+import time
+
+from ordering import game_handler
+
+
+def search(filename, algorithm):
+  """Returns the depth reached, the nodes searched and the time taken by the
+  agent to move on the board in `filename` (after a first search warming up
+  the pattern caches)."""
+  for _ in range(2):
+    gh, agent = game_handler(filename, algorithm, True)
+    start = time.time()
+    agent.find_move(gh)
+  return agent.ite_deep_depth, agent.nodes_searched, time.time() - start
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/expert/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-a', '--algorithms', nargs='+', type=str,
+                      default=['mtdf', 'pvs'], help="Minimax flavours.")
+  args = parser.parse_args()
+
+  print(f"{'board':<34} {'algorithm':>9} {'depth':>5} {'nodes':>7} "
+        f"{'nodes/s':>8}")
+  for filename in args.boards:
+    for algorithm in args.algorithms:
+      depth, nodes, elapsed = search(filename, algorithm)
+      print(f"{filename:<34} {algorithm:>9} {depth:>5} {nodes:>7} "
+            f"{nodes / elapsed:>8.0f}")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Plays timed games between an agent with quiescence search and one without,
+from board files (each agent playing both sides), and compares the depth they
+reach and the games they win."""
+import argparse
+import contextlib
+import glob
+import io
+
+from gomoku.rules import Rules
+from ordering import game_handler
+
+
+def play(filename, algorithm, quiescence_depths, max_moves):
+  """Plays the game from the board in `filename`, the player to move getting
+  the first quiescence depth of `quiescence_depths`.
+
+  Return
+  ------
+  winner: int
+    Index in `quiescence_depths` of the winner (None if no one won).
+  depths: list
+    depths[i] are the depths reached by the player of quiescence_depths[i].
+  """
+  gh, agent = game_handler(filename, algorithm, True)
+  agents = [agent, gh.players[2 - agent.color]]
+  for player, quiescence_depth in zip(agents, quiescence_depths):
+    player.quiescence_depth = quiescence_depth
+  depths = [[], []]
+  for _ in range(max_moves):
+    idx = agents.index(gh.players[gh.current])
+    with contextlib.redirect_stdout(io.StringIO()):
+      move = agents[idx].find_move(gh)
+    depths[idx].append(agents[idx].ite_deep_depth)
+    gh.do_move(move)
+    winner = Rules.check_winner(gh.board, gh.players, gh.threats)
+    if winner is not None:
+      return agents.index(winner), depths
+  return None, depths
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/evals/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-a', '--algorithm', type=str, default='alpha_beta',
+                      help="Minimax flavour.")
+  parser.add_argument('-q', '--quiescence-depth', type=int, default=4,
+                      help="Quiescence depth of the first agent.")
+  parser.add_argument('-m', '--max-moves', type=int, default=40,
+                      help="Moves played before calling a draw.")
+  args = parser.parse_args()
+
+  quiescence_depths = [args.quiescence_depth, 0]
+  wins, depths = [0, 0], [[], []]
+  print(f"{'board':<45} {'first':>6} {'winner':>6}")
+  for filename in args.boards:
+    for order in [1, -1]:
+      winner, game_depths = play(filename, args.algorithm,
+                                 quiescence_depths[::order], args.max_moves)
+      game_depths = game_depths[::order]
+      winner = None if winner is None else quiescence_depths[::order][winner]
+      if winner is not None:
+        wins[quiescence_depths.index(winner)] += 1
+      for i in range(2):
+        depths[i] += game_depths[i]
+      print(f"{filename:<45} {quiescence_depths[::order][0]:>6} "
+            f"{str(winner):>6}")
+  for i, quiescence_depth in enumerate(quiescence_depths):
+    print(f"quiescence depth {quiescence_depth}: {wins[i]} wins, mean depth "
+          f"{sum(depths[i]) / max(len(depths[i]), 1):.2f}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Compares the nodes searched, the time taken and the moves played with and
+without the symmetric transposition table, in self-play openings searched to
+a fixed depth."""
+import argparse
+import time
+
+import numpy as np
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.minimax import MiniMaxAgent
+
+
+def opening(algorithm, depth, plies, symmetric_table):
+  """Plays `plies` moves from the center stone with agents searching to
+  `depth`, returning the nodes searched, the time taken and the moves."""
+  agents = [MiniMaxAgent(color, depth, algorithm_name=algorithm)
+            for color in [1, 2]]
+  for agent in agents:
+    agent.time_limit = np.inf
+    agent.threat_space = agent.proof_number = False
+    agent.symmetric_table = symmetric_table
+  gh = GameHandler(Board(), agents)
+  gh.do_move(gh.board.center())
+  nodes, start = 0, time.time()
+  for _ in range(plies):
+    agent = gh.players[gh.current]
+    gh.do_move(agent.find_move(gh))
+    nodes += agent.nodes_searched
+  return nodes, time.time() - start, gh.move_history[1:]
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('-D', '--depth', type=int, default=5,
+                      help="Depth of the searches.")
+  parser.add_argument('-p', '--plies', type=int, default=3,
+                      help="Number of moves played after the center stone.")
+  args = parser.parse_args()
+
+  print(f"{'algorithm':<20} {'table':>10} {'nodes':>8} {'time':>8}  moves")
+  for algorithm in ['alpha_beta_memory', 'mtdf']:
+    for symmetric_table in [False, True]:
+      nodes, elapsed, moves = opening(algorithm, args.depth, args.plies,
+                                      symmetric_table)
+      table = 'symmetric' if symmetric_table else 'plain'
+      print(f"{algorithm:<20} {table:>10} {nodes:>8} {elapsed:>7.2f}s  "
+            f"{moves}")
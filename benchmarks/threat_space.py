@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Looks for wins by continuous fours (and threes) of both colors on board
+files, and compares the time find_move takes with and without it."""
+import argparse
+import contextlib
+import glob
+import io
+import time
+
+from gomoku.threat_space import ThreatSpaceSearch
+from ordering import game_handler
+
+
+def solve(filename, color, threes, time_limit):
+  """Returns the winning move found for color on the board in `filename`
+  (color being to move), the nodes searched and the time taken."""
+  gh, _ = game_handler(filename, 'alpha_beta', True)
+  gh.current = color - 1
+  search = ThreatSpaceSearch(gh, color, threes)
+  start = time.time()
+  move = search.solve(start + time_limit)
+  return move, search.nodes_searched, time.time() - start
+
+
+def find_move(filename, algorithm, threat_space):
+  """Returns the move of the agent to move on the board in `filename` and the
+  time find_move took."""
+  gh, agent = game_handler(filename, algorithm, True)
+  agent.threat_space = threat_space
+  start = time.time()
+  with contextlib.redirect_stdout(io.StringIO()):
+    move = agent.find_move(gh)
+  return tuple(map(int, move)), time.time() - start
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('boards', nargs='*', default=sorted(
+                      glob.glob("boards/evals/*.txt") +
+                      glob.glob("boards/expert/*.txt")),
+                      help="Text files which represent board states.")
+  parser.add_argument('-a', '--algorithm', type=str, default='mtdf',
+                      help="Minimax flavour.")
+  parser.add_argument('-t', '--time-limit', type=float, default=1,
+                      help="Time limit of each solve.")
+  args = parser.parse_args()
+
+  print(f"{'board':<45} {'color':>5} {'threes':>6} {'win':>8} {'nodes':>6} "
+        f"{'time':>6}")
+  for filename in args.boards:
+    for color in [1, 2]:
+      for threes in [False, True]:
+        move, nodes, elapsed = solve(filename, color, threes,
+                                     args.time_limit)
+        move = str(None if move is None else tuple(map(int, move)))
+        print(f"{filename:<45} {color:>5} {str(threes):>6} {move:>8} "
+              f"{nodes:>6} {elapsed:>6.3f}")
+  print()
+  print(f"{'board':<45} {'without':>16} {'with':>16}")
+  for filename in args.boards:
+    for _ in range(2):
+      results = [find_move(filename, args.algorithm, threat_space)
+                 for threat_space in [False, True]]
+    print(f"{filename:<45} " + " ".join(f"{str(move):>9} {elapsed:>6.3f}"
+                                        for move, elapsed in results))
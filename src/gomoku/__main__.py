@@ -4,11 +4,14 @@ import argparse
 
 import numpy as np
 
+from gomoku.bitboard import BitBoard
 from gomoku.board import Board
 from gomoku.game_handler import GameHandler
-from gomoku.minimax import minimax_agent_wrapper
+from gomoku.minimax import HEURISTICS, minimax_agent_wrapper
+from gomoku.opening_book import OpeningBook
 from gomoku.player import Player
 from gomoku.script import Script
+from gomoku.solved import SolvedPositions
 from gomoku.visualizer import Visualizer
 
 AGENTS = {
@@ -18,6 +21,7 @@ AGENTS = {
   "alpha_beta_memory": minimax_agent_wrapper("alpha_beta_memory"),
   "alpha_beta_basic": minimax_agent_wrapper("alpha_beta_basic"),
   "mtdf": minimax_agent_wrapper("mtdf"),
+  "pvs": minimax_agent_wrapper("pvs"),
 }
 CHOICES = AGENTS.keys()
 
@@ -26,10 +30,14 @@ if __name__ == '__main__':
 
   parser.add_argument('-b', '--board', type=str, default=None,
                       help='Text file which represent a board state.')
+  parser.add_argument("--bitboard", action='store_true', default=False,
+                      help="Store the board as bitmasks.")
+  parser.add_argument("--compact", action='store_true', default=False,
+                      help="Store the board intersections as int8.")
   parser.add_argument('-d', "--debug", action='store_true', default=False,
                       help="Enable terminal mode.")
-  parser.add_argument('-H', "--heuristic", type=str, default='?',
-                      help="Heuristic function.")
+  parser.add_argument('-H', "--heuristic", type=str, default=HEURISTICS[0],
+                      choices=HEURISTICS, help="Heuristic function.")
   parser.add_argument('-D', '--depth', type=int, default=10, help="Depth of the\
                         search tree for Minimax Agents", choices=range(1, 11))
   parser.add_argument('-p1', "--player1",
@@ -42,6 +50,12 @@ if __name__ == '__main__':
                       help="Choose Player 2 behaviour.")
   parser.add_argument('-s', "--script", type=str, default=None,
                       help="Text file to test sequence of moves.")
+  parser.add_argument("--solved", type=str, default=None,
+                      help="Binary file of solved positions consulted and "
+                      "extended by the agents.")
+  parser.add_argument("--book", type=str, default=None,
+                      help="Binary file of the opening book consulted by the "
+                      "agents.")
   parser.add_argument('-c', "--competition", type=float, default=np.Inf,
                       help="Enable competition mode (max time to play).")
 
@@ -52,13 +66,27 @@ if __name__ == '__main__':
   players.append(AGENTS[args.player1](1))
   players.append(AGENTS[args.player2](2))
 
+  solved = SolvedPositions(args.solved) if args.solved else None
+  book = OpeningBook(args.book) if args.book else None
+
   for player in players:
+    if hasattr(player, 'solved'):
+      player.solved = solved
+    if hasattr(player, 'book'):
+      player.book = book
     if hasattr(player, 'depth'):
       player.depth = args.depth
+    if hasattr(player, 'heuristic_name'):
+      player.heuristic_name = args.heuristic
 
   script = Script(args.script) if args.script else None
 
-  game = GameHandler(board=Board(filename=args.board),
+  if args.bitboard:
+    board = BitBoard(filename=args.board)
+  else:
+    board = Board(filename=args.board, compact=args.compact)
+
+  game = GameHandler(board=board,
                      players=players,
                      script=script,
                      time_limit=args.competition)
@@ -5,7 +5,8 @@ from gomoku.rules import Rules
 
 
 def is_node_terminal(gameHandler):
-  end = Rules.check_winner(gameHandler.board, gameHandler.players)
+  end = Rules.check_winner(gameHandler.board, gameHandler.players,
+                           gameHandler.threats)
   return end
 
 
@@ -45,3 +46,8 @@ class Agent(Player):
       The best move according to Agent.
     """
     pass
+
+  def undo(self):
+    """Forgets what was learnt since the last find_move, once its move and
+    the opponent move before it have been undone."""
+    pass
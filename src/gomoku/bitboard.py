@@ -0,0 +1,142 @@
+import numpy as np
+
+from gomoku.board import Board
+from gomoku.patterns import Lines
+
+
+def unpack(mask, nb_bits):
+  """Return the `nb_bits` lowest bits of the int `mask` as a uint8 array, least
+  significant bit first."""
+  raw = mask.to_bytes((nb_bits + 7) // 8, 'big')
+  bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8))[::-1]
+  return bits[:nb_bits]
+
+
+class BitBoard(Board):
+  """Class BitBoard. Same interface as Board, but the position is stored as one
+  arbitrary-precision int per color (plus an occupancy mask).
+
+  Intersection (x, y) is bit `x * stride + y`, with `stride = size + 1`: the
+  extra column is always empty so that shifting a mask along any of the four
+  SLOPES never wraps a line onto the next one.
+
+  Args:
+    filename: str (Default: None)
+      If filename is specify, load board state
+    size: int (Default: 19)
+      Size of the map
+    cmap: dict (Default: {0: '.', 1: 'X', 2: 'O'})
+      Map board value with symbol
+
+  Attributes
+  ----------
+  masks: int list
+    masks[color] has the bits of the stones of that color (masks[0] unused).
+  occupied: int
+    Bits of every stone on the board.
+  board: 2D array
+    Read-only int8 view of the position, rebuilt lazily after a change.
+  """
+  def __init__(self, filename=None, size=19, cmap={0: '.', 1: 'X', 2: 'O'}):
+    self.stride = size + 1
+    # bit shift for each direction of SLOPES, (-1, 1) being read as (1, -1)
+    self.shifts = [self.stride, self.stride - 1, 1, self.stride + 1]
+    self.full = sum(self.bit(x, y)
+                    for x in range(size) for y in range(size))
+    super().__init__(filename, size, cmap, compact=True)
+
+  def clear(self):
+    """Remove every stone from the board."""
+    self.masks = [0, 0, 0]
+    self.occupied = 0
+    self.lines = Lines(self.size)
+    self._view = None
+
+  @property
+  def board(self):
+    if self._view is None:
+      nb_bits = self.size * self.stride
+      view = (unpack(self.masks[1], nb_bits).astype(self.dtype) +
+              2 * unpack(self.masks[2], nb_bits).astype(self.dtype))
+      view = view.reshape(self.size, self.stride)[:, :self.size]
+      view.flags.writeable = False
+      self._view = view
+    return self._view
+
+  def bit(self, x, y):
+    """Return the bit of intersection (x, y)."""
+    # coordinates may be numpy integers, which would overflow when shifted
+    return 1 << (int(x) * self.stride + int(y))
+
+  def get(self, x, y):
+    """Return the value (0, 1 or 2) at intersection (x, y)."""
+    bit = self.bit(x, y)
+    if not self.occupied & bit:
+      return 0
+    return 1 if self.masks[1] & bit else 2
+
+  def is_empty(self, x, y):
+    """Return if the intersection (x, y) is empty."""
+    return not self.occupied & self.bit(x, y)
+
+  def is_stone(self, x, y, color):
+    """Return if the stone at intersection (x, y) belongs to player."""
+    return bool(self.masks[color] & self.bit(x, y))
+
+  def place(self, x, y, color):
+    """Place the player stone at intersection (x, y)."""
+    bit = self.bit(x, y)
+    if self.occupied & bit:
+      self.remove(x, y)
+    self.lines.add(x, y, int(color))
+    self.masks[color] |= bit
+    self.occupied |= bit
+    self._view = None
+    return self
+
+  def remove(self, x, y):
+    """Remove stone at intersection (x, y)."""
+    bit = self.bit(x, y)
+    if self.occupied & bit:
+      self.lines.add(x, y, -self.get(x, y))
+    self.masks[1] &= ~bit
+    self.masks[2] &= ~bit
+    self.occupied &= ~bit
+    self._view = None
+    return self
+
+  def empty_board(self):
+    """Returns true if the board is empty."""
+    return self.occupied == 0
+
+  def is_full(self):
+    """Returns True if the entire board is full."""
+    return self.occupied == self.full
+
+  def fives(self, color):
+    """Returns a mask per direction of SLOPES with the first bit of every five
+    (or more) stones of color aligned in that direction."""
+    mask, fives = self.masks[color], []
+    for shift in self.shifts:
+      run = mask
+      for i in range(1, 5):
+        run &= mask >> (i * shift)
+      fives.append(run)
+    return fives
+
+  def aligned_five(self, color, x=None, y=None):
+    """Return True if color has five aligned stones, going through (x, y) if
+    given."""
+    if x is None:
+      return any(self.fives(color))
+    if not (0 <= x < self.size and 0 <= y < self.size):
+      return False
+    position = int(x) * self.stride + int(y)
+    for shift, run in zip(self.shifts, self.fives(color)):
+      starts = 0
+      for i in range(5):
+        if position - i * shift >= 0:
+          starts |= 1 << (position - i * shift)
+      if run & starts:
+        return True
+    return False
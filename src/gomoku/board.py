@@ -2,6 +2,11 @@ import sys
 
 import numpy as np
 
+from gomoku.patterns import Lines
+
+DTYPE = np.float64
+COMPACT_DTYPE = np.int8
+
 
 class Board(object):
   """Class Board
@@ -13,17 +18,25 @@ class Board(object):
       Size of the map
     cmap: dict (Default: {0: '.', 1: 'X', 2: 'O'})
       Map board value with symbol
+    compact: bool (Default: False)
+      Store intersections as int8 instead of float64
 
   Attributes
   ----------
   board: 2D array
     The board
+  dtype: numpy.dtype
+    Type of the intersections of the board
+  lines: Lines
+    Packed code of every row, column and diagonal, updated on each change
   """
-  def __init__(self, filename=None, size=19, cmap={0: '.', 1: 'X', 2: 'O'}):
-    self.board = np.zeros((size, size))
+  def __init__(self, filename=None, size=19, cmap={0: '.', 1: 'X', 2: 'O'},
+               compact=False):
     self.filename = filename
     self.size = size
     self.cmap = cmap
+    self.dtype = COMPACT_DTYPE if compact else DTYPE
+    self.clear()
 
     if filename:
       self.parse(filename)
@@ -44,12 +57,21 @@ class Board(object):
       representation += "\n"
     return representation
 
+  def clear(self):
+    """Remove every stone from the board."""
+    self.board = np.zeros((self.size, self.size), dtype=self.dtype)
+    self.lines = Lines(self.size)
+
   def restart(self):
     """Reset board to it's initial state."""
-    self.board = np.zeros((self.size, self.size))
+    self.clear()
     if self.filename:
       self.parse(self.filename)
 
+  def get(self, x, y):
+    """Return the value (0, 1 or 2) at intersection (x, y)."""
+    return self.board[x][y]
+
   def is_empty(self, x, y):
     """Return if the intersection (x, y) is empty."""
     return self.board[x][y] == 0
@@ -60,17 +82,19 @@ class Board(object):
 
   def place(self, x, y, color):
     """Place the player stone at intersection (x, y)."""
+    self.lines.add(x, y, int(color - self.board[x][y]))
     self.board[x][y] = color
     return self
 
   def remove(self, x, y):
     """Remove stone at intersection (x, y)."""
+    self.lines.add(x, y, -int(self.board[x][y]))
     self.board[x][y] = 0
     return self
 
   def empty_board(self):
     """Returns true if the board is empty."""
-    return np.sum(self.board) == 0
+    return not self.board.any()
 
   def center(self):
     """Returns the coordinates of the center of the board."""
@@ -92,7 +116,8 @@ class Board(object):
       board = [l[1:] for l in raw[1:]]
       for i in range(self.size):
         for j in range(self.size):
-          self.board[i][j] = inv_cmap[board[i][j]]
+          if inv_cmap[board[i][j]]:
+            self.place(i, j, inv_cmap[board[i][j]])
     except Exception:
       print("Error encountered while parsing board, starting with empty board.")
-      self.board = np.zeros((self.size, self.size))
+      self.clear()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+from gomoku.opening_book import (BOOK_DEPTH, BOOK_FILE, BOOK_PLIES,
+                                 BOOK_WIDTH, OpeningBook,
+                                 OpeningBookBuilder)
+
+ALGORITHMS = ["alpha_beta", "alpha_beta_memory", "mtdf", "pvs"]
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(
+      description="Builds an opening book by self-play.")
+
+  parser.add_argument('-o', '--output', type=str, default=BOOK_FILE,
+                      help="Binary file of the book.")
+  parser.add_argument('-p', '--plies', type=int, default=BOOK_PLIES,
+                      help="Number of plies of the opening in the book.")
+  parser.add_argument('-w', '--width', type=int, default=BOOK_WIDTH,
+                      help="Number of moves followed from every position.")
+  parser.add_argument('-D', '--depth', type=int, default=BOOK_DEPTH,
+                      help="Depth of the searches.")
+  parser.add_argument('-a', '--algorithm', type=str,
+                      default="alpha_beta_memory", choices=ALGORITHMS,
+                      help="Minimax flavour of the agents.")
+
+  args = parser.parse_args()
+
+  builder = OpeningBookBuilder(args.plies, args.width, args.depth,
+                               args.algorithm)
+  start = time.time()
+  builder.write(args.output)
+  print(f"{args.output}: {len(OpeningBook(args.output))} moves of "
+        f"{len(builder.stats)} positions ({builder.positions_searched} "
+        f"searches, {time.time() - start:.2f}s)")
@@ -0,0 +1,85 @@
+from gomoku.patterns import EMPTY, WindowTracker, decode
+from gomoku.utils import SLOPES
+
+CAPTURE_REACH = 3
+
+_SLOPE_CAPTURES = {}
+
+
+def slope_captures(window):
+  """Sides (1 following the slope, -1 against it) where a stone of each color
+  at the center of `window` (the code of the 2 * CAPTURE_REACH + 1
+  intersections around it on a line) would capture two stones (none if the
+  center is not empty), cached by window."""
+  captures = _SLOPE_CAPTURES.get(window)
+  if captures is None:
+    cells, captures = decode(window, 2 * CAPTURE_REACH + 1), ()
+    for color in [1, 2]:
+      opponent, sides = 3 - color, ()
+      if cells[CAPTURE_REACH] == EMPTY:
+        for side in [1, -1]:
+          pair = [cells[CAPTURE_REACH + side * i] for i in range(1, 4)]
+          if pair == [opponent, opponent, color]:
+            sides += (side,)
+      captures += (sides,)
+    _SLOPE_CAPTURES[window] = captures
+  return captures
+
+
+class CaptureThreats(WindowTracker):
+  """Class CaptureThreats. For each color, the empty intersections where a stone
+  would capture a pair of opponent stones ('X O O .' patterns, cf.
+  Rules.capture).
+
+  A capture through an intersection only depends on the CAPTURE_REACH
+  intersections on each side of it on each line.
+
+  Parameters
+  ----------
+  board: Board
+    The board, whose line codes are read.
+
+  Attributes
+  ----------
+  values: list
+    values[l][k] are the sides of the k-th intersection of line l where a
+    stone of each color would capture.
+  counts: dict
+    counts[color][x][y] is the number of pairs a stone of color at (x, y)
+    would capture.
+  capturing: dict
+    capturing[color] is the set of intersections where color would capture.
+  """
+  reach = CAPTURE_REACH
+  evaluate = staticmethod(slope_captures)
+  blank = ((), ())
+
+  def clear(self):
+    size = self.board.size
+    self.counts = {color: [[0] * size for _ in range(size)]
+                   for color in [1, 2]}
+    self.capturing = {1: set(), 2: set()}
+
+  def changed(self, x, y, d, old, new):
+    for idx, color in enumerate([1, 2]):
+      if old[idx] == new[idx]:
+        continue
+      counts = self.counts[color]
+      counts[x][y] += len(new[idx]) - len(old[idx])
+      if counts[x][y] > 0:
+        self.capturing[color].add((x, y))
+      else:
+        self.capturing[color].discard((x, y))
+
+  def captures(self, x, y, color):
+    """Stones that a stone of color at (x, y) would capture."""
+    stones = []
+    for d, (dx, dy) in enumerate(SLOPES.tolist()):
+      for side in self.value(x, y, d)[color - 1]:
+        stones += [(x + side * dx, y + side * dy),
+                   (x + 2 * side * dx, y + 2 * side * dy)]
+    return stones
+
+  def can_capture(self, color):
+    """Return True if color can capture somewhere."""
+    return len(self.capturing[color]) > 0
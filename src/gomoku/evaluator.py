@@ -0,0 +1,74 @@
+from gomoku.heuristics import SCALE, advantage_combinations, line_score
+from gomoku.utils import opposite
+
+MAX_CACHE = 1 << 18
+
+_LINE_CACHE = {}
+
+
+def line_values(code, length):
+  """Scaled scores of a line for every (color, my_turn), followed by the number
+  of winning groups of each color, cached by line code."""
+  values = _LINE_CACHE.get(code)
+  if values is None:
+    if len(_LINE_CACHE) >= MAX_CACHE:
+      _LINE_CACHE.clear()
+    (s_10, w_1), (s_11, _) = (line_score(code, length, 1, 0),
+                              line_score(code, length, 1, 1))
+    (s_20, w_2), (s_21, _) = (line_score(code, length, 2, 0),
+                              line_score(code, length, 2, 1))
+    values = (s_10, s_11, s_20, s_21, w_1, w_2)
+    _LINE_CACHE[code] = values
+  return values
+
+
+class Evaluator(object):
+  """Class Evaluator. Incremental version of heuristics.heuristic (without past
+  scores): keeps the contribution of every line of the board for both colors,
+  and only recomputes the four lines going through an intersection when it
+  changes.
+
+  Parameters
+  ----------
+  board: Board
+    The board, whose line codes are read.
+
+  Attributes
+  ----------
+  values: tuple list
+    values[l] are the line_values of line l when it was last updated.
+  totals: int list
+    Sum of values over all the lines.
+  """
+  def __init__(self, board):
+    self.board = board
+    self.reset()
+
+  def reset(self):
+    """Recompute every line from scratch."""
+    self.lines = self.board.lines
+    self.values = [line_values(code, length)
+                   for code, length in zip(self.lines.codes,
+                                           self.lines.lengths)]
+    self.totals = [sum(column) for column in zip(*self.values)]
+
+  def update(self, x, y):
+    """Update the lines going through (x, y) after it changed."""
+    codes, lengths, totals = self.lines.codes, self.lines.lengths, self.totals
+    for line, _ in self.lines.through[x][y]:
+      old, new = self.values[line], line_values(codes[line], lengths[line])
+      if new is not old:
+        for i in range(6):
+          totals[i] += new[i] - old[i]
+        self.values[line] = new
+
+  def color_score(self, color, my_turn):
+    """Same as heuristics.color_score (without past scores)."""
+    tot = self.totals[2 * (color - 1) + int(bool(my_turn))]
+    winning_groups = self.totals[4 + color - 1]
+    return tot / SCALE + advantage_combinations(winning_groups)
+
+  def heuristic(self, color, my_turn):
+    """Same as heuristics.heuristic (without past scores)."""
+    return (self.color_score(color, my_turn) -
+            self.color_score(opposite(color), not my_turn))
@@ -0,0 +1,69 @@
+from gomoku.patterns import CELL_MASK, EMPTY, WindowTracker
+from gomoku.rules import CENTER_MASK, CENTER_SHIFT, THREES_REACH, slope_threes
+
+_WINDOW_THREES = {}
+
+
+def window_threes(window):
+  """Number of free threes that a stone of each color at the center of
+  `window` would introduce (none if the center is not empty), cached by
+  window."""
+  threes = _WINDOW_THREES.get(window)
+  if threes is None:
+    if (window >> CENTER_SHIFT) & CELL_MASK != EMPTY:
+      threes = (0, 0)
+    else:
+      threes = tuple(slope_threes(window & ~CENTER_MASK |
+                                  color << CENTER_SHIFT, color)
+                     for color in [1, 2])
+    _WINDOW_THREES[window] = threes
+  return threes
+
+
+class ForbiddenMoves(WindowTracker):
+  """Class ForbiddenMoves. For each color, the intersections where a stone
+  would introduce two free-three alignments (cf. Rules.no_double_threes).
+
+  Free threes through an intersection only depend on the THREES_REACH
+  intersections on each side of it on each line.
+
+  Parameters
+  ----------
+  board: Board
+    The board, whose line codes are read.
+
+  Attributes
+  ----------
+  values: list
+    values[l][k] are the numbers of free threes that a stone of each color at
+    the k-th intersection of line l would introduce on that line.
+  threes: dict
+    threes[color][x][y] is the number of free threes that a stone of color at
+    (x, y) would introduce.
+  forbidden: dict
+    forbidden[color] is the set of intersections where color cannot play.
+  """
+  reach = THREES_REACH
+  evaluate = staticmethod(window_threes)
+  blank = (0, 0)
+
+  def clear(self):
+    size = self.board.size
+    self.threes = {color: [[0] * size for _ in range(size)]
+                   for color in [1, 2]}
+    self.forbidden = {1: set(), 2: set()}
+
+  def changed(self, x, y, d, old, new):
+    for idx, color in enumerate([1, 2]):
+      if old[idx] == new[idx]:
+        continue
+      threes = self.threes[color]
+      threes[x][y] += new[idx] - old[idx]
+      if threes[x][y] > 1:
+        self.forbidden[color].add((x, y))
+      else:
+        self.forbidden[color].discard((x, y))
+
+  def is_forbidden(self, x, y, color):
+    """Return True if color cannot play at (x, y)."""
+    return (x, y) in self.forbidden[color]
@@ -0,0 +1,72 @@
+NEIGHBOURS = [(dx, dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1]
+              if (dx, dy) != (0, 0)]
+
+
+class Frontier(object):
+  """Class Frontier. The candidate moves of the position: the empty
+  intersections next to at least one stone.
+
+  Every intersection keeps the number of stones among its eight neighbours.
+  The intersections with at least one are kept in an insertion-ordered dict,
+  the most recently reached last, so that adding or removing a stone only
+  touches its eight neighbours and iteration order is reproducible. Stones
+  stay in the dict (they are skipped when iterating), so that undoing a move
+  restores the exact order it was played from.
+
+  Parameters
+  ----------
+  board: Board
+    The board.
+
+  Attributes
+  ----------
+  counts: int 2D list
+    counts[x][y] is the number of stones around (x, y).
+  stones: bool 2D list
+    stones[x][y] is True if there is a stone at (x, y).
+  cells: dict
+    Intersections with a stone around, in the order they were reached.
+  """
+  def __init__(self, board):
+    self.board = board
+    self.reset()
+
+  def reset(self):
+    """Recompute every intersection from scratch."""
+    size = self.board.size
+    self.counts = [[0] * size for _ in range(size)]
+    self.stones = [[False] * size for _ in range(size)]
+    self.cells = {}
+    for x in range(size):
+      for y in range(size):
+        if not self.board.is_empty(x, y):
+          self.update(x, y)
+
+  def update(self, x, y):
+    """Update the neighbours of (x, y) after it changed."""
+    stone = not self.board.is_empty(x, y)
+    if stone == self.stones[x][y]:
+      return
+    self.stones[x][y] = stone
+    delta, size = 1 if stone else -1, self.board.size
+    for dx, dy in NEIGHBOURS:
+      _x, _y = x + dx, y + dy
+      if not (0 <= _x < size and 0 <= _y < size):
+        continue
+      self.counts[_x][_y] += delta
+      if self.counts[_x][_y] == 0:
+        del self.cells[(_x, _y)]
+      elif delta == 1 and self.counts[_x][_y] == 1:
+        self.cells[(_x, _y)] = None
+
+  def moves(self):
+    """Empty intersections next to a stone, the most recently reached last."""
+    stones = self.stones
+    return [(x, y) for x, y in self.cells if not stones[x][y]]
+
+  def __contains__(self, move):
+    x, y = move
+    return move in self.cells and not self.stones[x][y]
+
+  def __len__(self):
+    return len(self.moves())
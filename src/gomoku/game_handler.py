@@ -1,13 +1,18 @@
-import copy
 import time
 
 import numpy as np
 
 from gomoku.agent import Agent
+from gomoku.captures import CaptureThreats
+from gomoku.evaluator import Evaluator
+from gomoku.forbidden import ForbiddenMoves
+from gomoku.frontier import Frontier
 from gomoku.minimax import minimax_agent_wrapper
+from gomoku.priorities import MovePriorities
 from gomoku.rules import Rules
-from gomoku.utils import (get_player_name, is_there_stones_around,
-                          nearby_stones, update_child_after_move)
+from gomoku.symmetry import SymmetricHashes, canonical_hash
+from gomoku.utils import get_player_name, is_there_stones_around
+from gomoku.zobrist import Zobrist
 
 
 class GameHandler(object):
@@ -34,6 +39,8 @@ class GameHandler(object):
     Error string
   capture_history: list
     List of coordinates of captured stones.
+  capture_events: list
+    Indices in capture_history of the moves that captured stones.
   move_history: list
     List of corrdinates of done moves
   turn: int
@@ -44,8 +51,27 @@ class GameHandler(object):
     Agent who predict the next move if we need help
   begin: float
     Time when agent started to compute move.
-  child_list: (int, int) list
-    List of possible moves for the minimax agent.
+  frontier: Frontier
+    Possible moves for the agents (empty intersections next to a stone).
+  priorities: MovePriorities
+    Threat level of every intersection, used to order the possible moves.
+  zobrist: Zobrist
+    Random keys used to hash positions.
+  hash: int
+    Zobrist hash of the current position, updated at each move.
+  hash_history: list
+    Hash before each move, restored on undo.
+  evaluator: Evaluator
+    Incremental evaluation of the position.
+  forbidden: ForbiddenMoves
+    Intersections where each color cannot play (double free-threes).
+  threats: CaptureThreats
+    Intersections where each color would capture.
+  trackers: list
+    Incremental structures updated with the intersections changed by a move.
+  symmetries: SymmetricHashes
+    Hashes of the symmetric images of the board, once track_symmetries was
+    called (None until then).
   """
   def __init__(self, board, players, script=None, size=19, time_limit=np.Inf):
     self.board = board
@@ -58,8 +84,7 @@ class GameHandler(object):
     self.error = ""
     self.msg = ""
     self.capture_history = []
-    self.old_old_capture_history = []
-    self.old_capture_history = []
+    self.capture_events = []
     self.move_history = []
     self.state_history = []
     self.turn = 1
@@ -69,7 +94,23 @@ class GameHandler(object):
       if not isinstance(players[i], Agent):
         self.helpAgent = minimax_agent_wrapper("mtdf")(players[i].color)
     self.begin = -1
-    self.child_list = []
+    self.zobrist = Zobrist(size)
+    self.hash = self.zobrist.hash(board, self.current,
+                                  self.get_player_captures())
+    self.hash_history = []
+    self.evaluator = Evaluator(board)
+    self.forbidden = ForbiddenMoves(board)
+    self.threats = CaptureThreats(board)
+    self.frontier = Frontier(board)
+    self.priorities = MovePriorities(board)
+    self.trackers = [self.evaluator, self.forbidden, self.threats,
+                     self.frontier, self.priorities]
+    self.symmetries = None
+
+  @property
+  def child_list(self):
+    """List of possible moves, the most recently reached last."""
+    return self.frontier.moves()
 
   def restart(self):
     """Reset all attributes to their initial states"""
@@ -78,7 +119,7 @@ class GameHandler(object):
       player.captures = 0
       player.last_move = (-2, -2)
       player.aligned_five_prev = False
-      if hasattr(player, 'undo_scores'):
+      if hasattr(player, 'reset'):
         player.reset()
     if self.script:
       self.script.restart()
@@ -87,14 +128,38 @@ class GameHandler(object):
     self.error = ""
     self.msg = ""
     self.capture_history = []
+    self.capture_events = []
     self.move_history = []
     self.state_history = []
     self.turn = 1
     self.winner = None
     self.begin = -1
-    self.child_list = []
+    self.hash = self.zobrist.hash(self.board, self.current,
+                                  self.get_player_captures())
+    self.hash_history = []
+    for tracker in self.trackers:
+      tracker.reset()
     return self
 
+  def track_symmetries(self):
+    """Starts updating the hashes of the symmetric images of the board
+    (cf. canonical_hash)."""
+    if self.symmetries is None:
+      self.symmetries = SymmetricHashes(self.board, self.zobrist)
+      self.trackers.append(self.symmetries)
+
+  def canonical_hash(self):
+    """Canonical hash of the current position (the least hash of its images
+    by the 8 symmetries of the board) and the symmetry giving it."""
+    if self.symmetries is not None:
+      return self.symmetries.canonical(self.hash)
+    return canonical_hash(self.board, self.zobrist, self.hash)
+
+  def update_trackers(self, x, y):
+    """Update incremental structures after intersection (x, y) changed."""
+    for tracker in self.trackers:
+      tracker.update(x, y)
+
   def start(self):
     """Main Function, run the game"""
     print(self)
@@ -143,7 +208,8 @@ class GameHandler(object):
     self.turn += 1
 
     if self.winner is None:
-      self.winner = Rules.check_winner(self.board, self.players)
+      self.winner = Rules.check_winner(self.board, self.players,
+                                       self.threats)
     else:
       self.msg = "by time"
 
@@ -176,12 +242,9 @@ class GameHandler(object):
       return False
     player.last_move = (x, y)
 
-    self.board.place(x, y, player.color)
-    if not Rules.no_double_threes(self.board, player):
-      self.board.remove(x, y)
+    if self.forbidden.is_forbidden(x, y, player.color):
       self.error = f"\033[1;31mNo double free-threes allowed\033[0m"
       return False
-    self.board.remove(x, y)
     return True
 
   def do_move(self, move):
@@ -189,19 +252,25 @@ class GameHandler(object):
     self.state_history.append([player.last_move,
                                player.captures,
                                player.aligned_five_prev])
+    self.hash_history.append(self.hash)
     self.board.place(*move, player.color)
+    self.update_trackers(*move)
     player.last_move = tuple(move)
     self.move_history.append(move)
+    self.hash ^= self.zobrist.stone(*move, player.color) ^ self.zobrist.side
 
     # updating captures
+    previous_captures = player.captures
     captures = Rules.capture(self.board, player)
     if captures:
-      self.old_old_capture_history = copy.deepcopy(self.old_capture_history)
-      self.old_capture_history = copy.deepcopy(self.capture_history)
+      self.capture_events.append(len(self.capture_history))
+      opponent = self.players[1 - self.current]
+      for x, y in captures:
+        self.update_trackers(x, y)
+        self.hash ^= self.zobrist.stone(x, y, opponent.color)
+      self.hash ^= (self.zobrist.capture(self.current, previous_captures) ^
+                    self.zobrist.capture(self.current, player.captures))
     self.capture_history.append(captures)
-
-    # updating child list
-    update_child_after_move(self, captures, move)
     self.current = 1 - self.current
     return True
 
@@ -211,48 +280,52 @@ class GameHandler(object):
     self.state_history.append([player.last_move,
                                player.captures,
                                player.aligned_five_prev])
+    self.hash_history.append(self.hash)
     self.board.place(*move, player.color)
+    self.update_trackers(*move)
     player.last_move = tuple(move)
+    self.hash ^= self.zobrist.stone(*move, player.color) ^ self.zobrist.side
+
+  def pass_move(self):
+    """The player to move passes (used by null-move pruning)."""
+    self.hash_history.append(self.hash)
+    self.hash ^= self.zobrist.side
+    self.current = 1 - self.current
+
+  def undo_pass(self):
+    self.hash = self.hash_history.pop()
+    self.current = 1 - self.current
 
   def basic_undo(self):
     x, y = self.move_history.pop()
     last_move, captures, aligned_five_prev = self.state_history.pop()
-    stone = self.board.board[x][y]
+    stone = self.board.get(x, y)
     player = self.players[0 if stone == 1 else 1]
     player.last_move = last_move
     player.captures = captures
     player.aligned_five_prev = aligned_five_prev
     self.board.remove(x, y)
+    self.update_trackers(x, y)
+    self.hash = self.hash_history.pop()
 
   def undo_move(self):
     x, y = self.move_history.pop()
     previous_dead = self.capture_history.pop()
+    if previous_dead:
+      self.capture_events.pop()
     last_move, captures, aligned_five_prev = self.state_history.pop()
-    stone = self.board.board[x][y]
+    stone = self.board.get(x, y)
     player = self.players[0 if stone == 1 else 1]
     opponent = self.players[1 if stone == 1 else 0]
+    for x_dead, y_dead in reversed(previous_dead):
+      self.board.place(x_dead, y_dead, opponent.color)
+      self.update_trackers(x_dead, y_dead)
     self.board.remove(x, y)
-    if (is_there_stones_around(self.board.board, x, y) and
-        (x, y) not in self.child_list):
-      self.child_list.append((x, y))
-    for stone in nearby_stones((x, y), self.board):
-      if (stone in self.child_list and not
-          is_there_stones_around(self.board.board, *stone)):
-        self.child_list.remove(stone)
-    for x, y in previous_dead:
-      self.board.place(x, y, opponent.color)
-      if (x, y) in self.child_list:
-        self.child_list.remove((x, y))
-    for x, y in previous_dead:
-      for stone in nearby_stones((x, y), self.board):
-        if (stone not in self.child_list and stone not in previous_dead and
-            self.board.is_empty(*stone)):
-          self.child_list.append(stone)
+    self.update_trackers(x, y)
     player.last_move = last_move
     player.captures = captures
     player.aligned_five_prev = aligned_five_prev
-    if hasattr(player, 'undo_table'):
-      player.table = player.undo_table
+    self.hash = self.hash_history.pop()
     self.current = 1 - self.current
     return self
 
@@ -281,11 +354,9 @@ class GameHandler(object):
     return children
 
   def retrieve_captured_stones(self):
-    all_captures = [move for captures in self.capture_history
-                    for move in captures]
-    all_captures_old = [move for captures in self.old_old_capture_history
-                        for move in captures]
-    return list(set(all_captures) - set(all_captures_old))
+    """Stones captured by the last two moves that captured stones."""
+    return [stone for idx in self.capture_events[-2:]
+            for stone in self.capture_history[idx]]
 
   def last_move(self):
     return (-1, -1) if not self.move_history else self.move_history[-1]
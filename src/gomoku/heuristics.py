@@ -1,8 +1,14 @@
+from fractions import Fraction
+from math import gcd
+
 import numpy as np
 
+from gomoku.patterns import (BITS, PAD, WALL, decode, window_codes,
+                             window_mask)
 from gomoku.utils import SLOPES, opposite, were_impacted_slope
 
 MAX_CAPTURES = 10
+SCORE_DTYPE = np.float64
 SCORE = {
   'XXXXX': 1e15,
   'OXXXX.': 1e14,
@@ -139,7 +145,8 @@ def threat_score(x, y, dx, dy, position, color, my_turn):
   return threat * (SCORE['XXX.X'] if my_turn else SCORE['OOO.O'])
 
 
-def color_score(position, color, my_turn, stones=[], past_scores=None):
+def color_score(position, color, my_turn, stones=[], past_scores=None,
+                changes=None):
   """Looking only at the stones of color `color`, and knowing that it's
   `my_turn` (or not), decide how good is my `position`.
 
@@ -155,6 +162,9 @@ def color_score(position, color, my_turn, stones=[], past_scores=None):
     List of stones (last moves, stones captured).
   past_scores: (numpy.ndarray, numpy.ndarray)
     Score previously computed in basic_color_score.
+  changes: dict (Default: None)
+    If given, past_scores are left untouched and the new scores that differ
+    from them are written to changes[(x, y)] instead.
 
   Return
   ------
@@ -178,9 +188,13 @@ def color_score(position, color, my_turn, stones=[], past_scores=None):
           dtot += score(nb_cons, op_ends, my_turn)
           winning_groups += winning_stones(nb_cons, op_ends)
       tot += dtot
-      if past_scores is not None:
+      if changes is not None:
+        if dtot != past_scores[x][y]:
+          changes[(x, y)] = dtot
+      elif past_scores is not None:
         past_scores[x][y] = dtot
-  return tot + advantage_combinations(winning_groups), past_scores
+  return (tot + advantage_combinations(winning_groups),
+          past_scores if changes is None else changes)
 
 
 def basic_color_score(position, color, my_turn, stones=[], past_scores=None):
@@ -225,7 +239,8 @@ def basic_color_score(position, color, my_turn, stones=[], past_scores=None):
   return tot, past_scores
 
 
-def heuristic(position, color, my_turn, stones=[], past_scores=None):
+def heuristic(position, color, my_turn, stones=[], past_scores=None,
+              copy_on_write=False):
   """Evaluation function used for estimating the value of a node in minimax.
 
   Parameters
@@ -240,6 +255,9 @@ def heuristic(position, color, my_turn, stones=[], past_scores=None):
     List of stones (last moves, stones captured).
   past_scores: (numpy.ndarray, numpy.ndarray)
     Score previously computed in basic_color_score.
+  copy_on_write: bool (Default: False)
+    If True, past_scores are left untouched, and the changes to apply to them
+    (cf. apply_changes) are returned instead of the new scores.
 
   Return
   ------
@@ -247,14 +265,27 @@ def heuristic(position, color, my_turn, stones=[], past_scores=None):
     How the situation looks like taking into account the two players.
   """
   past_score_1, past_score_2 = past_scores if past_scores else (None, None)
+  changes_1, changes_2 = ({}, {}) if copy_on_write else (None, None)
   first_score, new_past_scores_1 = color_score(position, color, my_turn,
-                                               stones, past_score_1)
+                                               stones, past_score_1, changes_1)
   second_score, new_past_scores_2 = color_score(position, opposite(color),
                                                 not my_turn, stones,
-                                                past_score_2)
+                                                past_score_2, changes_2)
   return (first_score - second_score), (new_past_scores_1, new_past_scores_2)
 
 
+def apply_changes(past_scores, changes):
+  """Applies to `past_scores` (in place) the `changes` returned by heuristic
+  (with copy_on_write), and returns the changes that would revert them."""
+  reverse = ({}, {})
+  for scores, color_changes, color_reverse in zip(past_scores, changes,
+                                                  reverse):
+    for (x, y), value in color_changes.items():
+      color_reverse[(x, y)] = scores[x][y]
+      scores[x][y] = value
+  return reverse
+
+
 def capture_heuristic(player, opponent, our_stones):
   """Takes into account the capture rules, and make capture more likely.
 
@@ -272,9 +303,12 @@ def capture_heuristic(player, opponent, our_stones):
   score: int
     How the situation looks like taking into account the two players's captures.
   """
-  if player.captures == MAX_CAPTURES:
-    return np.inf
   sign = 1 if our_stones else -1
+  # reaching MAX_CAPTURES wins (captures can go past it by capturing two pairs)
+  if player.captures >= MAX_CAPTURES:
+    return sign * np.inf
+  if opponent.captures >= MAX_CAPTURES:
+    return -sign * np.inf
   diff = player.captures - opponent.captures
   return sign * diff * SCORE['stone_captured']
 
@@ -345,3 +379,207 @@ def score(consecutive, open_ends, my_turn):
       return SCORE['.X.']
   if (open_ends == 0):
     return SCORE['no open ends']
+
+
+def window_score(cells, color, my_turn):
+  """Score and number of winning groups that color_score gives to the second of
+  the six `cells` (the previous intersection and the next four ones on a line),
+  using slope (0, 1) on the first row of a square position. A wall behaves
+  exactly like an opponent stone for color_score."""
+  position = np.zeros((WINDOW, WINDOW))
+  position[0] = [opposite(color) if cell == WALL else cell for cell in cells]
+  if position[0][1] != color:
+    return Fraction(0), 0
+  value = Fraction(threat_score(0, 1, 0, 1, position, color, my_turn))
+  nb_cons = nb_consecutives(0, 1, 0, 1, position, color)
+  if nb_cons == 0:
+    return value, 0
+  op_ends = nb_open_ends(0, 1, 0, 1, nb_cons, position)
+  value += Fraction(score(nb_cons, op_ends, my_turn))
+  return value, int(winning_stones(nb_cons, op_ends))
+
+
+def compile_tables():
+  """Compile SCORE into lookup tables indexed by the code of a window of
+  WINDOW intersections (cf. patterns.Lines). Scores are scaled to ints so that
+  they can be summed exactly, in any order.
+
+  Return
+  ------
+  scale: int
+    Every score of the tables is multiplied by scale.
+  score_table: dict
+    score_table[color][my_turn][code] is the scaled score of the second
+    intersection of the window.
+  win_table: dict
+    win_table[color][code] is the number of winning groups starting there.
+  """
+  nb_codes = 1 << (BITS * WINDOW)
+  values, win_table = {}, {}
+  for color in [1, 2]:
+    values[color] = [[0] * nb_codes for _ in range(2)]
+    win_table[color] = [0] * nb_codes
+    for code in range(nb_codes):
+      cells = decode(code, WINDOW)
+      if cells[1] != color:
+        continue
+      for my_turn in [0, 1]:
+        value, wins = window_score(cells, color, my_turn)
+        values[color][my_turn][code] = value
+      win_table[color][code] = wins
+  scale = 1
+  for color in [1, 2]:
+    for table in values[color]:
+      for value in table:
+        denominator = Fraction(value).denominator
+        scale = scale * denominator // gcd(scale, denominator)
+  score_table = {color: [[int(value * scale) for value in table]
+                         for table in values[color]] for color in [1, 2]}
+  return scale, score_table, win_table
+
+
+def line_score(code, length, color, my_turn):
+  """Scaled score and number of winning groups of color on a line.
+
+  Parameters
+  ----------
+  code: int
+    Code of the line (cf. patterns.Lines).
+  length: int
+    Number of intersections of the line.
+  color: int
+    Color of the stones we're looking at.
+  my_turn: bool
+    Is it my turn or not?
+
+  Return
+  ------
+  tot: int
+    Sum of color_score over the line, times SCALE.
+  winning_groups: int
+    Number of winning groups of color on the line.
+  """
+  table, wins = SCORE_TABLE[color][int(bool(my_turn))], WIN_TABLE[color]
+  tot = winning_groups = 0
+  code >>= BITS * (PAD - 1)
+  for _ in range(length):
+    window = code & WINDOW_MASK
+    tot += table[window]
+    winning_groups += wins[window]
+    code >>= BITS
+  return tot, winning_groups
+
+
+def pattern_color_score(lines, color, my_turn):
+  """Same as color_score (without past scores), using the line codes of the
+  board and the compiled tables."""
+  tot = winning_groups = 0
+  for code, length in zip(lines.codes, lines.lengths):
+    line_tot, line_groups = line_score(code, length, color, my_turn)
+    tot += line_tot
+    winning_groups += line_groups
+  return tot / SCALE + advantage_combinations(winning_groups)
+
+
+def pattern_heuristic(lines, color, my_turn):
+  """Same as heuristic (without past scores), using the line codes of the
+  board and the compiled tables."""
+  return (pattern_color_score(lines, color, my_turn) -
+          pattern_color_score(lines, opposite(color), not my_turn))
+
+
+WINDOW = 6
+WINDOW_MASK = window_mask(WINDOW)
+SCALE, SCORE_TABLE, WIN_TABLE = compile_tables()
+
+
+def vectorized_color_score(codes, color, my_turn):
+  """Same as color_score, for the window codes (cf. window_score) of every
+  intersection of a position.
+
+  Return
+  ------
+  tot_score: int
+    How much total score do I get based on another function `score`.
+  past_scores: numpy.ndarray
+    Score of each intersection.
+  """
+  cell_scores = SCORE_ARRAY[color, int(bool(my_turn))][codes].sum(axis=-3)
+  winning_groups = WIN_ARRAY[color][codes].sum()
+  tot = cell_scores.sum() / SCALE + advantage_combinations(winning_groups)
+  return tot, (cell_scores / SCALE).astype(SCORE_DTYPE)
+
+
+def vectorized_heuristic(position, color, my_turn, stones=[], past_scores=None):
+  """Same as heuristic, but evaluates the whole position at once with numpy
+  instead of looping over intersections and slopes. `stones` and
+  `past_scores` are only there for compatibility, everything is recomputed.
+
+  Return
+  ------
+  score: int
+    How the situation looks like taking into account the two players.
+  past_scores: (numpy.ndarray, numpy.ndarray)
+    Score of each intersection, for both colors.
+  """
+  codes = window_codes(np.asarray(position), 1, WINDOW - 2)
+  first_score, past_score_1 = vectorized_color_score(codes, color, my_turn)
+  second_score, past_score_2 = vectorized_color_score(codes, opposite(color),
+                                                      not my_turn)
+  return (first_score - second_score), (past_score_1, past_score_2)
+
+
+def batch_heuristic(positions, color, to_move, captures=None,
+                    chunk_size=1024):
+  """Evaluates a stack of positions at once, with the same weights as heuristic
+  (and capture_heuristic if captures are given).
+
+  Parameters
+  ----------
+  positions: numpy.ndarray
+    Board positions, of shape (N, size, size).
+  color: int or numpy.ndarray
+    Color (of shape (N,) if it depends on the position) whose point of view is
+    taken.
+  to_move: int or numpy.ndarray
+    Color of the player to move in each position (my_turn is to_move == color).
+  captures: numpy.ndarray (Default: None)
+    Number of stones captured by players 1 and 2, of shape (N, 2).
+  chunk_size: int (Default: 1024)
+    Number of positions evaluated together, to bound memory usage.
+
+  Return
+  ------
+  scores: numpy.ndarray
+    Score of each position, of shape (N,).
+  """
+  positions = np.asarray(positions)
+  nb_positions = len(positions)
+  color = np.broadcast_to(color, (nb_positions,)).astype(np.int64)
+  my_turn = np.broadcast_to(to_move, (nb_positions,)) == color
+  scores = np.zeros(nb_positions, dtype=SCORE_DTYPE)
+  for start in range(0, nb_positions, chunk_size):
+    chunk = slice(start, start + chunk_size)
+    codes = window_codes(positions[chunk], 1, WINDOW - 2)
+    for sign, colors, turns in [(1, color[chunk], my_turn[chunk]),
+                                (-1, 3 - color[chunk], ~my_turn[chunk])]:
+      colors = colors[:, None, None, None]
+      turns = turns.astype(np.int64)[:, None, None, None]
+      tot = SCORE_ARRAY[colors, turns, codes].sum(axis=(1, 2, 3))
+      winning_groups = WIN_ARRAY[colors, codes].sum(axis=(1, 2, 3))
+      scores[chunk] += sign * (tot / SCALE +
+                               advantage_combinations(winning_groups))
+  if captures is not None:
+    captures = np.asarray(captures)
+    ours = captures[np.arange(nb_positions), color - 1]
+    theirs = captures[np.arange(nb_positions), 2 - color]
+    scores += (ours - theirs) * SCORE['stone_captured']
+    scores[theirs >= MAX_CAPTURES] = -np.inf
+    scores[ours >= MAX_CAPTURES] = np.inf
+  return scores
+
+
+SCORE_ARRAY = np.array([np.zeros_like(SCORE_TABLE[1]), SCORE_TABLE[1],
+                        SCORE_TABLE[2]], dtype=np.int64)
+WIN_ARRAY = np.array([np.zeros_like(WIN_TABLE[1]), WIN_TABLE[1],
+                      WIN_TABLE[2]], dtype=np.int64)
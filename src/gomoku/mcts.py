@@ -30,11 +30,11 @@ class MCTSAgent(MiniMaxAgent):
     self.rollout_time = 0.45 * time_limit
 
   def relevant_moves(self):
-    relev_mov, idx = [], 0
+    relev_mov, idx, child_list = [], 0, self.gh.child_list
     while (idx < len(self.gh.move_history)
            and len(relev_mov) < MAX_MOVES):
       x, y = self.gh.move_history[-idx-1]
-      for move in reversed(self.gh.child_list):
+      for move in reversed(child_list):
         if len(relev_mov) >= MAX_MOVES:
           break
         for (dx, dy) in SLOPES:
@@ -57,15 +57,25 @@ class MCTSAgent(MiniMaxAgent):
       return gh.board.center()
     self.gh, self.start = gh, time.time()
     self.update_tree()
-    while self.resources_left():
-      self.mcts(n_iterations=1)
-    move = self.best_child()
+    move = self.book_move()
+    if move is None:
+      move = self.solved_move()
+    if move is None:
+      while self.resources_left():
+        self.mcts(n_iterations=1)
+      move = self.best_child()
     if time.time()-self.start > self.time_limit:
       exit(f"Exit: agent {self.algorithm_name} took too long to find his move")
     self.tree = self.tree.traverse_one(move)
     self.current_node = self.tree
     return move
 
+  def undo(self):
+    node = self.tree
+    for _ in range(2):
+      node = node.parent if node is not None else None
+    self.tree = node
+
   def pick_random_list(self, move_list, max_counter):
     counter = 0
     while True and counter < max_counter:
@@ -151,11 +161,12 @@ class MCTSAgent(MiniMaxAgent):
     number of visits of the edge from parent to child.
     cf. https://www.cs.swarthmore.edu/~bryce/cs63/s16/slides/2-15_MCTS.pdf
     """
-    weights = self.current_node.get_ucb(self.gh.child_list, UCB_CONSTANT)
+    child_list = self.gh.child_list
+    weights = self.current_node.get_ucb(child_list, UCB_CONSTANT)
     weights = weights - np.min(weights) + 1e-15
     distribution = (1 / np.sum(weights)) * weights
     idx = np.random.choice(len(weights), p=distribution)
-    return self.gh.child_list[idx]
+    return child_list[idx]
 
   def traverse_one(self, move):
     self.gh.do_move(move)
@@ -1,19 +1,48 @@
-import copy
 import time
 
 import numpy as np
 
 from gomoku.agent import Agent
-from gomoku.heuristics import (SCORE, capture_heuristic, heuristic,
-                               past_heuristic)
+from gomoku.heuristics import (SCORE, SCORE_DTYPE, apply_changes,
+                               capture_heuristic, heuristic, past_heuristic,
+                               vectorized_heuristic)
+from gomoku.priorities import CAPTURE_WEIGHT
+from gomoku.proof_number import ProofNumberSearch
 from gomoku.rules import Rules
+from gomoku.solved import WIN
+from gomoku.symmetry import transform
+from gomoku.threat_space import ThreatSpaceSearch
+from gomoku.transposition import TranspositionTable
 from gomoku.utils import best_values, opposite
 
 TIME_LIMIT = 0.5
-MTDF_BREAKING_TIME = 0.5 * TIME_LIMIT
-ITE_BREAKING_TIME = 0.5 * TIME_LIMIT
 SIMPLE_EVAL_MAX_TIME = 0.35 * TIME_LIMIT
+# share of the time limit given to the search of a win by continuous fours
+THREAT_TIME = 0.1
+# share of the time limit given to the proof-number search of a win
+PN_TIME = 0.2
+# searches are aborted past this share of the time limit
+SEARCH_TIME = 0.9
+# flavours whose root search can be given a window
+WINDOWED = ['alpha_beta', 'alpha_beta_memory', 'pvs']
+# the position after a null move is searched that many plies shallower
+NULL_MOVE_REDUCTION = 1
+# children searched at full depth before late move reductions
+LMR_MOVES = 4
+# children of at least that priority (captures, threes...) are not reduced
+LMR_PRIORITY = CAPTURE_WEIGHT
+# plies of forcing moves (captures, fours and answers to fours) played out
+# past the leaves, when quiescence search is on
+QUIESCENCE_DEPTH = 4
 MAX_CHILD = 32
+MAX_KILLERS = 2
+# the best history score adds that much to the priority of a move, enough to
+# reorder moves of close priorities
+HISTORY_WEIGHT = 2
+# only moves of at least that priority (captures, threes...) go before the
+# killer moves
+KILLER_PRIORITY = CAPTURE_WEIGHT
+HEURISTICS = ['incremental', 'vectorized', 'legacy']
 
 
 def minimax_agent_wrapper(algorithm_name):
@@ -56,61 +85,205 @@ class MiniMaxAgent(Agent):
     Maximum number of moves checked with maximum depth.
   algorithm_name: string
     The name of the special minimax flavor.
+
+  Attributes
+  ----------
+  heuristic_name: string
+    How leaves are evaluated (one of HEURISTICS): 'incremental' reads the
+    evaluator of the game handler, 'vectorized' evaluates the whole board
+    with numpy, 'legacy' recomputes heuristics.heuristic from the score maps
+    of the previous move.
+  move_ordering: bool
+    If True, children are searched by decreasing priority (cf.
+    MovePriorities), else the most recent ones of the child list are.
+  use_history: bool
+    If True, killer moves and history scores are used to order children.
+  killers: dict
+    killers[ply] are the last moves that caused a cutoff at that ply during
+    the current find_move (kept across iterative deepening iterations).
+  history: dict
+    history[color][x][y] increases each time color playing (x, y) caused a
+    cutoff, and is halved at each find_move.
+  root_depth: int
+    Depth of the current iterative deepening iteration.
+  score_history: list
+    For each find_move, the changes that revert what it did to the score maps
+    (cf. heuristics.apply_changes), applied by undo.
+  color_scores_dict: dict
+    color_scores_dict[move] are the changes to the score maps (cf.
+    heuristics.apply_changes) in the position after the root move `move`.
+  root_ply: int
+    Number of moves played before the position searched by find_move.
+  pv_table: dict
+    pv_table[depth] is the principal variation found from the last node
+    searched at `depth` by pvs_search (triangular PV table).
+  pv_lines: dict
+    pv_lines[move] is the principal variation after the root move `move`
+    found by the last pvs iteration, searched first by the next one.
+  table: TranspositionTable
+    Bounds and best moves of the positions searched by alpha_beta_memory,
+    kept across moves (entries of older searches are replaced first).
+  symmetric_table: bool
+    If True, positions are stored in the table under their canonical hash
+    (cf. GameHandler.canonical_hash) and their best move in the canonical
+    orientation, so that symmetric positions share their entry.
+  nodes_searched: int
+    Number of nodes searched during the last find_move.
+  cutoffs: int
+    Number of beta cutoffs during the last find_move.
+  ite_deep_depth: int
+    Last depth fully searched by iterative deepening.
+  null_move: bool
+    If True, nodes where the side to move would still get a cutoff after
+    passing are pruned (cf. null_move_value).
+  late_move_reductions: bool
+    If True, quiet children after the first LMR_MOVES ones are searched one
+    ply shallower, and searched again at full depth if they beat the best
+    child so far.
+  root_values: dict
+    root_values[move] is the value of the root move `move` found by the last
+    find_move (infinite for a forced win, empty if it did not search).
+  book: OpeningBook
+    Opening book consulted before anything else (None if no book).
+  solved: SolvedPositions
+    Store of the positions proven won or lost, consulted before searching
+    and extended with the wins proven by the agent (None if no store).
+  threat_space: bool
+    If True, a win by continuous fours is looked for first (cf.
+    ThreatSpaceSearch), during THREAT_TIME of the time limit, and played at
+    once if found.
+  proof_number: bool
+    If True, a win is then looked for by proof-number search (cf.
+    ProofNumberSearch), during PN_TIME of the time limit, and played at once
+    if proven.
+  quiescence_depth: int
+    Plies of forcing moves searched past the leaves (cf. quiescence), e.g.
+    QUIESCENCE_DEPTH. If 0, leaves are evaluated as they are.
+  aspiration_window: float
+    If not None, root moves are first searched within this share of their
+    value at the previous depth (aspiration window).
+  deadline: float
+    Time after which searches are aborted.
+  aborted: bool
+    True once the current search passed the deadline (its values are then
+    meaningless).
   """
   def __init__(self, color=1, depth=2, max_top_moves=5, algorithm_name='mtdf'):
     super().__init__(color)
     self.depth = depth
     self.max_top_moves = max_top_moves
     self.debug = False
-    self.table = {}
-    self.undo_table = {}
+    self.table = TranspositionTable()
+    self.symmetric_table = False
     self.time_limit = 0.5
-    self.color_scores = np.zeros((19, 19)), np.zeros((19, 19))
-    self.undo_scores = np.zeros((19, 19)), np.zeros((19, 19))
+    self.color_scores = self.blank_scores()
+    self.score_history = []
     self.color_scores_dict = {}
+    self.root_ply = 0
     self.last_captures = []
     self.algorithm_name = algorithm_name
     self.minimaximizer = self.get_algorithm(algorithm_name)
     self.gh = None
     self.ite_deep_depth = 0
+    self.heuristic_name = 'incremental'
+    self.move_ordering = True
+    self.use_history = True
+    self.killers = {}
+    self.history = {color: np.zeros((19, 19), dtype=int) for color in [1, 2]}
+    self.root_depth = 0
+    self.pv_table = {}
+    self.pv_lines = {}
+    self.nodes_searched = 0
+    self.cutoffs = 0
+    self.null_move = False
+    self.late_move_reductions = False
+    self.root_values = {}
+    self.book = None
+    self.solved = None
+    self.threat_space = True
+    self.proof_number = True
+    self.quiescence_depth = 0
+    self.aspiration_window = None
+    self.deadline = np.inf
+    self.aborted = False
 
   def get_algorithm(self, algorithm_name):
     return getattr(self, algorithm_name)
 
+  @staticmethod
+  def blank_scores(size=19):
+    return (np.zeros((size, size), dtype=SCORE_DTYPE),
+            np.zeros((size, size), dtype=SCORE_DTYPE))
+
   def reset(self):
-    self.table = {}
-    self.undo_table = {}
-    self.color_scores = np.zeros((19, 19)), np.zeros((19, 19))
-    self.undo_scores = np.zeros((19, 19)), np.zeros((19, 19))
+    self.killers = {}
+    self.history = {color: np.zeros((19, 19), dtype=int) for color in [1, 2]}
+    self.table.clear()
+    self.color_scores = self.blank_scores()
+    self.score_history = []
     self.color_scores_dict = {}
 
   def get_id(self):
-    return hash(self.gh.board.board.tostring())
+    return self.gh.hash
+
+  def table_key(self):
+    """Key of the current position in the table, and the symmetry mapping
+    moves to the orientation of the entry (0 unless symmetric_table)."""
+    if self.symmetric_table:
+      return self.gh.canonical_hash()
+    return self.get_id(), 0
+
+  def undo(self):
+    if self.score_history:
+      for changes in reversed(self.score_history.pop()):
+        apply_changes(self.color_scores, changes)
 
   def update(self, move_to_play):
-    # in case of undo we still want to have the previous scores/tables available
-    self.undo_scores = copy.deepcopy(self.color_scores)
-    self.undo_table = copy.deepcopy(self.table)
     # only update color score according to move we're (actually) playing
     if move_to_play in self.color_scores_dict:
-      self.color_scores = self.color_scores_dict[move_to_play]
+      self.score_history[-1].append(apply_changes(
+          self.color_scores, self.color_scores_dict[move_to_play]))
 
   def update_because_opponent_played(self):
-    player, opponent = self.return_players()
-    self.evaluation(self.color, True, opponent, player)
-    self.color_scores = self.color_scores_dict[opponent.last_move]
+    if self.heuristic_name == 'legacy':
+      player, opponent = self.return_players()
+      _, changes = self.legacy_heuristic(self.color, True, opponent, player)
+      self.score_history[-1].append(apply_changes(self.color_scores, changes))
+
+  def keep_scores(self, move, changes=None):
+    """Keeps the changes to the score maps of the position after `move` if
+    it is a root move (update only needs those)."""
+    if len(self.gh.move_history) == self.root_ply + 1:
+      self.color_scores_dict[move] = changes if changes else ({}, {})
 
   def find_move(self, gh):
     self.start = time.time()
+    self.deadline = self.start + SEARCH_TIME * self.time_limit
+    self.aborted = False
+    self.nodes_searched, self.cutoffs, self.ite_deep_depth = 0, 0, 0
+    self.root_values = {}
     # if first move, play in the center
     if gh.board.empty_board():
       return gh.board.center()
-    self.gh = gh
+    self.gh, self.root_ply = gh, len(gh.move_history)
+    if self.symmetric_table:
+      gh.track_symmetries()
+    self.new_search()
     player, opponent = self.return_players()
+    # changes made to the score maps by this search, reverted by undo
+    self.score_history.append([])
     # need to update color scores accordingly to opponent's last move
     self.update_because_opponent_played()
     # Retrieve last captures (used in heuristics)
     self.last_captures = gh.retrieve_captured_stones()
+    # play a book move or a forced win at once
+    move = self.book_move()
+    if move is not None:
+      return move
+    move = self.winning_move()
+    if move is not None:
+      self.root_values = {move: np.inf}
+      return move
     # Estimate moves using a depth = 0 evaluation on each of them
     score_map = self.simple_evaluation()
     # Find the list of best moves using this score map
@@ -121,9 +294,10 @@ class MiniMaxAgent(Agent):
                                 if gh.can_place(*move)])
     # find best candidates with iterative deepening
     values = self.iterative_deepening(candidates, raw_val)
+    self.root_values = dict(zip(candidates, values))
     # compute the best move
     move_to_play = candidates[np.argmax(values)]
-    # save scores and transposition table
+    # save scores
     self.update(move_to_play)
     if time.time()-self.start > self.time_limit:
       print(f"Agent {self.algorithm_name} lost because took >"
@@ -131,24 +305,127 @@ class MiniMaxAgent(Agent):
       self.gh.winner = opponent
     return move_to_play
 
+  def solved_move(self):
+    """Winning move of the current position in the solved positions store,
+    found from any of its symmetric images (None if it is not known to be
+    won)."""
+    if self.solved is None:
+      return None
+    key, sym = self.gh.canonical_hash()
+    entry = self.solved.lookup(key)
+    if entry is None or entry[0] != WIN or entry[1] is None:
+      return None
+    move = transform(*entry[1], sym, self.gh.size, inverse=True)
+    return move if self.can_play(*move) else None
+
+  def book_move(self):
+    """Best move of the current position in the opening book (None if it is
+    not in the book)."""
+    if self.book is None:
+      return None
+    move = self.book.lookup(self.gh)
+    return move if move is not None and self.can_play(*move) else None
+
+  def can_play(self, x, y):
+    """Return True if the agent may play at (x, y)."""
+    return (self.gh.board.is_empty(x, y) and
+            not self.gh.forbidden.is_forbidden(x, y, self.color))
+
+  def winning_move(self):
+    """Winning move of the current position, looked up in the solved
+    positions store, else proven by the threat-space search (if
+    threat_space) or the proof-number search (if proof_number), the proof
+    being added to the store (None if no win was found)."""
+    move = self.solved_move()
+    if move is not None:
+      return move
+    if self.threat_space:
+      move = ThreatSpaceSearch(self.gh, self.color).solve(
+          self.start + THREAT_TIME * self.time_limit)
+    if move is None and self.proof_number:
+      proven, move = ProofNumberSearch(self.gh, self.color).solve(
+          time.time() + PN_TIME * self.time_limit)
+      if not proven:
+        move = None
+    if move is not None and self.solved is not None:
+      key, sym = self.gh.canonical_hash()
+      self.solved.add(key, WIN, transform(*move, sym, self.gh.size))
+    return move
+
   def iterative_deepening(self, moves, initial_values):
+    """Searches the root moves deeper and deeper until the deadline.
+
+    A depth is only started if its first two moves are predicted to be
+    searched in time (the values of a depth are only used if at least two
+    moves were): their cost at the last depth times the effective branching
+    factor observed between the last two depths. Once started, the moves are
+    searched until the deadline aborts the search.
+
+    Return
+    ------
+    values: list
+      Values of the first root moves searched at the deepest depth.
+    """
     values = ([list(initial_values)] +
               [[0 for _ in range(len(moves))] for _ in range(self.depth - 1)])
-    depth, i = 0, len(moves)
+    costs = [[0 for _ in range(len(moves))] for _ in range(self.depth)]
+    nodes = [len(moves)] + [0 for _ in range(self.depth - 1)]
+    depth = 0
     for depth in range(1, self.depth):
       if self.debug:
         print(f"depth {depth + 1}")
+      self.root_depth = depth
+      # effective branching factor (none known for the first depth)
+      branching = nodes[depth - 1] / nodes[depth - 2] if depth > 1 else 0
+      if time.time() + branching * sum(costs[depth - 1][:2]) > self.deadline:
+        if self.debug:
+          print(f"not enough time for depth {depth + 1}")
+        return values[depth - 1]
       for i in range(len(moves)):
-        if time.time() - self.start >= ITE_BREAKING_TIME:
+        start, nodes_searched = time.time(), self.nodes_searched
+        value = self.search_root(moves[i], depth, values[depth - 1][i],
+                                 max(values[depth][:i], default=-np.inf))
+        if self.aborted:
           if self.debug:
             print(f"break at iteration {i}")
           return best_values(values, depth, i)
-        if self.algorithm_name == 'mtdf':
-          values[depth][i] = self.minimaximizer(moves[i], depth,
-                                                values[depth - 1][i])
-        else:
-          values[depth][i] = self.minimaximizer(moves[i], depth)
-    return best_values(values, depth, i)
+        values[depth][i] = value
+        costs[depth][i] = time.time() - start
+        nodes[depth] += self.nodes_searched - nodes_searched
+      self.ite_deep_depth = depth
+    return values[depth]
+
+  def search_root(self, move, depth, guess, best):
+    """Value of the root move `move` at `depth`, only searched as far as
+    needed to know whether it is better than the value `best` of another root
+    move (if the flavour takes a window), first within an aspiration window
+    around its value `guess` at the previous depth (if aspiration_window).
+
+    Return
+    ------
+    value: int
+      The value of the move, or an upper bound of it if it is at most best.
+    """
+    if self.algorithm_name == 'mtdf':
+      return self.minimaximizer(move, depth, guess)
+    if self.algorithm_name not in WINDOWED:
+      return self.minimaximizer(move, depth)
+    if best == np.inf:
+      return best
+    if self.aspiration_window and abs(guess) != np.inf:
+      delta = self.aspiration_window * abs(guess)
+      alpha, beta = max(best, guess - delta), guess + delta
+      if alpha < beta:
+        value = self.minimaximizer(move, depth, alpha=alpha, beta=beta)
+        if not (value >= beta or best < value <= alpha):
+          return value
+    return self.minimaximizer(move, depth, alpha=best, beta=np.inf)
+
+  def out_of_time(self):
+    """Return True (from then on) once the search passed the deadline."""
+    if not self.aborted and time.time() >= self.deadline:
+      self.aborted = True
+    return self.aborted
 
   def simple_evaluation(self):
     """Returns a score map for possible moves using a depth = 1 evaluation.
@@ -160,7 +437,7 @@ class MiniMaxAgent(Agent):
     """
     gh, size = self.gh, self.gh.size
     player, opponent = self.return_players()
-    score_map = np.full((size, size), -np.inf)
+    score_map = np.full((size, size), -np.inf, dtype=SCORE_DTYPE)
     for (x, y) in reversed(gh.child_list):
       if time.time() - self.start >= SIMPLE_EVAL_MAX_TIME:
         break
@@ -210,22 +487,283 @@ class MiniMaxAgent(Agent):
     value: int
       The estimated value of the current node (position) being evaluated.
     """
-    captures = self.gh.retrieve_captured_stones()
-    position = self.gh.board.board
-    stones = [player.last_move, opponent.last_move] + captures
-    h_score, c_score = heuristic(position, color, my_turn, stones,
-                                 copy.deepcopy(self.color_scores))
-    self.color_scores_dict[player.last_move] = c_score
+    if self.heuristic_name == 'legacy':
+      h_score, changes = self.legacy_heuristic(color, my_turn, player,
+                                               opponent)
+      self.keep_scores(player.last_move, changes)
+    elif self.heuristic_name == 'vectorized':
+      h_score, _ = vectorized_heuristic(self.gh.board.board, color, my_turn)
+    else:
+      h_score = self.gh.evaluator.heuristic(color, my_turn)
     h_past = past_heuristic(opponent.last_move, player.last_move)
     return ((h_score + capture_heuristic(player, opponent,
                                          player.color == self.color) + h_past))
 
+  def legacy_heuristic(self, color, my_turn, player, opponent):
+    """heuristics.heuristic of the current position, only recomputing the
+    lines through the last moves and captures.
+
+    Return
+    ------
+    value: int
+      The value of the position.
+    changes: (dict, dict)
+      The changes to the score maps (cf. heuristics.apply_changes).
+    """
+    captures = self.gh.retrieve_captured_stones()
+    stones = [player.last_move, opponent.last_move] + captures
+    return heuristic(self.gh.board.board, color, my_turn, stones,
+                     self.color_scores, copy_on_write=True)
+
   def return_players(self, max_player=True):
     # current player depends on if we're maximizing
     move_color = self.color if max_player else opposite(self.color)
     players = self.gh.players
     return players[move_color - 1], players[opposite(move_color) - 1]
 
+  def new_search(self):
+    """Forgets the killer moves and the score map changes, and ages the history
+    scores and the transposition table before searching a new position."""
+    self.killers = {}
+    self.pv_lines = {}
+    self.color_scores_dict = {}
+    self.table.new_search()
+    for color in [1, 2]:
+      self.history[color] //= 2
+
+  def store_cutoff(self, move, color, depth):
+    """Remembers that color playing move caused a cutoff at `depth`."""
+    killers = self.killers.setdefault(self.root_depth - depth, [])
+    if move not in killers:
+      killers.insert(0, move)
+      del killers[MAX_KILLERS:]
+    self.history[color][move] += depth * depth
+
+  def children(self, color, max_child=MAX_CHILD, depth=None, first=None):
+    """Returns the `max_child` best moves of the child list that color is
+    allowed to play (i.e. that do not introduce double free-threes), best
+    first.
+
+    With move ordering, moves are sorted by priority plus history score (if
+    use_history), which reorders moves of close priorities, and the killer
+    moves come right after the first move (the best move of the
+    transposition table, or else the best by priority), only tactical moves
+    going before them. Without it, the last moves of the child list are
+    taken, killer moves first and then by history score (if use_history).
+
+    Parameters
+    ----------
+    color: int
+      The color to play.
+    max_child: int
+      Maximum number of moves.
+    depth: int (Default: None)
+      Depth of the node the moves are played from, to look up its killer
+      moves.
+    first: (int, int) (Default: None)
+      Move searched first if legal (e.g. the best move of the transposition
+      table).
+    """
+    forbidden = self.gh.forbidden.forbidden[color]
+    moves = [move for move in self.gh.child_list if move not in forbidden]
+    if (first is not None and first not in forbidden and
+            self.gh.board.is_empty(*first)):
+      moves = [move for move in moves if move != first]
+    else:
+      first = None
+    head = [first] if first else []
+    if not self.move_ordering:
+      moves = moves[-max_child:]
+      if not self.use_history:
+        return (head + moves)[:max_child]
+    # most recent moves first among moves of same priority
+    moves.reverse()
+    history, killers = self.history[color], []
+    if self.use_history and depth is not None:
+      killers = self.killers.get(self.root_depth - depth, [])
+    if not self.move_ordering:
+      moves.sort(key=lambda move: (move in killers, history[move]),
+                 reverse=True)
+      return (head + moves)[:max_child]
+    priority = self.gh.priorities.priority
+    if not self.use_history:
+      moves.sort(key=lambda move: priority(*move, color), reverse=True)
+    else:
+      # the best history score is worth HISTORY_WEIGHT
+      scale = HISTORY_WEIGHT / max(history.max(), 1)
+      moves.sort(key=lambda move: (priority(*move, color) +
+                                   scale * history[move]), reverse=True)
+    moves = head + moves
+    if killers:
+      slot = 1
+      while (slot < len(moves) and
+             priority(*moves[slot], color) >= KILLER_PRIORITY):
+        slot += 1
+      killers = [move for move in killers if move in moves[slot:]]
+      moves = moves[:slot] + killers + [move for move in moves[slot:]
+                                        if move not in killers]
+    return moves[:max_child]
+
+  def is_forcing(self, color):
+    """Return True if color threatens to capture or to align five (its
+    opponent could then not pass)."""
+    if self.gh.threats.can_capture(color):
+      return True
+    completes_five = self.gh.priorities.completes_five
+    return any(completes_five(x, y, color) for x, y in self.gh.child_list)
+
+  def null_move_value(self, search, depth, max_player, lim):
+    """Value of the current node if the side to move passes, the player who
+    just moved playing again NULL_MOVE_REDUCTION plies shallower. If even
+    that value gives a cutoff, so would the node (there is no zugzwang in
+    gomoku).
+
+    The null move is not tried (None is returned) without a cutoff bound,
+    too close to the leaves, or if either side threatens to capture or to
+    align five, since the answer to the threat would be skipped.
+
+    Parameters
+    ----------
+    search: function
+      The minimax flavour searching the children.
+    depth: int
+      The depth of the current node.
+    max_player: bool
+      Are we maximizing or not at the current node?
+    lim: list
+      The alpha and beta bounds of the current node.
+
+    Return
+    ------
+    value: int
+      The value of the node after the null move (None if not tried).
+    """
+    player, opponent = self.return_players(max_player)
+    if (not self.null_move or depth < NULL_MOVE_REDUCTION + 2 or
+            abs(lim[1 - max_player]) == np.inf or
+            self.is_forcing(player.color) or self.is_forcing(opponent.color)):
+      return None
+    self.gh.pass_move()
+    # the player who just moved plays again
+    sign = -1 if max_player else 1
+    val = sign * np.inf
+    # null window above the cutoff bound: only the cutoff matters
+    bound = lim[1 - max_player]
+    window = [bound, bound + 1] if max_player else [bound - 1, bound]
+    for new_move in self.children(player.color):
+      val = sign * min(sign * val,
+                       sign * search(new_move, depth - 2 - NULL_MOVE_REDUCTION,
+                                     max_player, window[0], window[1]))
+      if sign * (window[max_player] - val) >= 0:
+        break
+      window[1 - max_player] = sign * min(sign * window[1 - max_player],
+                                          sign * val)
+    self.gh.undo_pass()
+    return val
+
+  def reduction(self, idx, depth, move, color):
+    """Number of plies the idx-th child `move` of color is searched
+    shallower by late move reductions."""
+    if (self.late_move_reductions and depth >= 2 and idx >= LMR_MOVES and
+            self.gh.priorities.priority(*move, color) < LMR_PRIORITY):
+      return 1
+    return 0
+
+  def forcing_moves(self, color):
+    """Moves of color that cannot be left unanswered: aligning five, blocking
+    a five of the opponent, capturing and making a four, in that order.
+
+    Return
+    ------
+    moves: (int, int) list
+      The forcing moves color is allowed to play.
+    forced: bool
+      True if the opponent threatens to align five, color then having to
+      play one of the moves (it cannot stand pat).
+    """
+    gh = self.gh
+    alignment = gh.priorities.alignment
+    forbidden = gh.forbidden.forbidden[color]
+    wins, blocks, fours = [], [], []
+    for move in reversed(gh.child_list):
+      if move in forbidden:
+        continue
+      mine = alignment(*move, color)
+      if mine == 4:
+        wins.append(move)
+      elif alignment(*move, opposite(color)) == 4:
+        blocks.append(move)
+      elif mine == 3:
+        fours.append(move)
+    captures = [move for move in gh.threats.capturing[color]
+                if move not in forbidden and move not in wins + blocks]
+    if blocks:
+      return wins + blocks + captures, True
+    return wins + captures + fours, False
+
+  def quiescence(self, max_player, alpha, beta, depth=None):
+    """Value of the current position (the player of max_player just moved)
+    once its forcing moves are played out, up to quiescence_depth plies: the
+    player to move either stands pat (takes the evaluation of the position)
+    or plays a forcing move (cf. forcing_moves), unless it has to answer a
+    four.
+
+    Parameters
+    ----------
+    max_player: bool
+      Are we maximizing or not at the current position?
+    alpha: int
+      The current lower bound for the cutoff.
+    beta: int
+      The current upper bound for the cutoff.
+    depth: int (Default: None)
+      Plies of forcing moves left (quiescence_depth if None).
+
+    Return
+    ------
+    value: int
+      The estimated value of the current position.
+    """
+    player, opponent = self.return_players(max_player)
+    val = self.evaluation(self.color, 1 - max_player, player, opponent)
+    depth = self.quiescence_depth if depth is None else depth
+    if depth == 0:
+      return val
+    moves, forced = self.forcing_moves(opponent.color)
+    if not moves:
+      return val
+    sign = 1 if max_player else -1
+    lim = [alpha, beta]
+    if forced:
+      val = sign * np.inf
+    elif sign * (lim[1 - max_player] - val) >= 0:
+      return val
+    else:
+      lim[max_player] = sign * min(sign * lim[max_player], sign * val)
+    for new_move in moves:
+      val = sign * min(sign * val,
+                       sign * self.quiesce(new_move, depth - 1, 1 - max_player,
+                                           lim[0], lim[1]))
+      if sign * (lim[1 - max_player] - val) >= 0:
+        self.cutoffs += 1
+        break
+      lim[max_player] = sign * min(sign * lim[max_player], sign * val)
+    return val
+
+  def quiesce(self, move, depth, max_player, alpha, beta):
+    """Value of the forcing move `move` (cf. quiescence)."""
+    if self.out_of_time():
+      return 0
+    player, opponent = self.return_players(max_player)
+    self.gh.do_move(move)
+    self.nodes_searched += 1
+    if Rules.aligned_win(self.gh.board, player):
+      self.gh.undo_move()
+      return SCORE['XXXXX'] if player.color == self.color else -SCORE['XXXXX']
+    val = self.quiescence(max_player, alpha, beta, depth)
+    self.gh.undo_move()
+    return val
+
   def minimax(self, move, depth, max_player=True):
     """The minimax function returns a heuristic value for leaf nodes (terminal
     nodes and nodes at the maximum search depth). Non leaf nodes inherit their
@@ -245,21 +783,24 @@ class MiniMaxAgent(Agent):
     value: int
       The estimated value of the current node (position) being evaluated.
     """
+    if self.out_of_time():
+      return 0
     player, opponent = self.return_players(max_player)
     self.gh.do_move(move)
+    self.nodes_searched += 1
 
     # hardcoding forcing moves here to stop three exploring
     if Rules.aligned_win(self.gh.board, player):
-      self.color_scores_dict[move] = self.color_scores
+      self.keep_scores(move)
       self.gh.undo_move()
       return SCORE['XXXXX'] if player.color == self.color else -SCORE['XXXXX']
 
     if depth == 0:
-      val = self.evaluation(self.color, 1 - max_player, player, opponent)
+      val = self.quiescence(max_player, -np.inf, np.inf)
     else:
       sign = 1 if max_player else -1
       val = sign * np.inf
-      for new_move in self.gh.child_list[-MAX_CHILD:]:
+      for new_move in self.children(opponent.color):
         val = sign * min(sign * val,
                          sign * self.minimax(new_move, depth - 1,
                                              1 - max_player))
@@ -288,26 +829,41 @@ class MiniMaxAgent(Agent):
     value: int
       The estimated value of the current node (position) being evaluated.
     """
+    if self.out_of_time():
+      return 0
     player, opponent = self.return_players(max_player)
     self.gh.do_move(move)
+    self.nodes_searched += 1
 
     # hardcoding forcing moves here to stop three exploring
     if Rules.aligned_win(self.gh.board, player):
-      self.color_scores_dict[move] = self.color_scores
+      self.keep_scores(move)
       self.gh.undo_move()
       return SCORE['XXXXX'] if player.color == self.color else -SCORE['XXXXX']
 
     if depth == 0:
-      val = self.evaluation(self.color, 1 - max_player, player, opponent)
+      val = self.quiescence(max_player, alpha, beta)
     else:
       sign = 1 if max_player else -1
       val = sign * np.inf
       lim = [alpha, beta]
-      for new_move in self.gh.child_list[-MAX_CHILD:]:
-        val = sign * min(sign * val,
-                         sign * self.alpha_beta(new_move, depth - 1,
-                                                1 - max_player, lim[0], lim[1]))
+      null_val = self.null_move_value(self.alpha_beta, depth, max_player, lim)
+      if null_val is not None and sign * (lim[1 - max_player] - null_val) >= 0:
+        self.cutoffs += 1
+        self.gh.undo_move()
+        return null_val
+      children = self.children(opponent.color, depth=depth)
+      for idx, new_move in enumerate(children):
+        reduction = self.reduction(idx, depth, new_move, opponent.color)
+        new_val = self.alpha_beta(new_move, depth - 1 - reduction,
+                                  1 - max_player, lim[0], lim[1])
+        if reduction and sign * new_val < sign * lim[max_player]:
+          new_val = self.alpha_beta(new_move, depth - 1, 1 - max_player,
+                                    lim[0], lim[1])
+        val = sign * min(sign * val, sign * new_val)
         if sign * (lim[1 - max_player] - val) >= 0:
+          self.cutoffs += 1
+          self.store_cutoff(new_move, opponent.color, depth)
           break
         lim[max_player] = sign * min(sign * lim[max_player], sign * val)
     self.gh.undo_move()
@@ -336,19 +892,22 @@ class MiniMaxAgent(Agent):
     value: int
       The estimated value of the current node (position) being evaluated.
     """
+    if self.out_of_time():
+      return 0
     player, opponent = self.return_players(max_player)
     self.gh.do_move(move)
+    self.nodes_searched += 1
 
     # hardcoding forcing moves here to stop three exploring
     if Rules.aligned_win(self.gh.board, player):
-      self.color_scores_dict[move] = self.color_scores
+      self.keep_scores(move)
       self.gh.undo_move()
       return SCORE['XXXXX'] if player.color == self.color else -SCORE['XXXXX']
 
     # tests if already seen node (that's why it's called "with memory")
-    node_id = self.get_id()
-    n = self.table[node_id] if node_id in self.table else None
-    if n and depth < n.depth:
+    node_id, sym = self.table_key()
+    n = self.table.probe(node_id)
+    if n and depth <= n.depth:
       if n.lowerbound >= beta:
         self.gh.undo_move()
         return n.lowerbound
@@ -358,51 +917,158 @@ class MiniMaxAgent(Agent):
       alpha = max(alpha, n.lowerbound)
       beta = min(beta, n.upperbound)
 
+    best_move = None
     if depth == 0:
-      val = self.evaluation(self.color, 1 - max_player, player, opponent)
+      val = self.quiescence(max_player, alpha, beta)
     else:
       sign = 1 if max_player else -1
       val = sign * np.inf
       lim = [alpha, beta]
-      for new_move in self.gh.child_list[-MAX_CHILD:]:
-        val = sign * min(sign * val,
-                         sign * self.alpha_beta_memory(new_move,
-                                                       depth - 1,
-                                                       1 - max_player,
-                                                       lim[0],
-                                                       lim[1]))
+      null_val = self.null_move_value(self.alpha_beta_memory, depth,
+                                      max_player, lim)
+      if null_val is not None and sign * (lim[1 - max_player] - null_val) >= 0:
+        self.cutoffs += 1
+        self.gh.undo_move()
+        return null_val
+      first = None
+      if n and n.move:
+        first = transform(*n.move, sym, self.gh.size, inverse=True)
+      children = self.children(opponent.color, depth=depth, first=first)
+      for idx, new_move in enumerate(children):
+        reduction = self.reduction(idx, depth, new_move, opponent.color)
+        new_val = self.alpha_beta_memory(new_move, depth - 1 - reduction,
+                                         1 - max_player, lim[0], lim[1])
+        if reduction and sign * new_val < sign * lim[max_player]:
+          new_val = self.alpha_beta_memory(new_move, depth - 1,
+                                           1 - max_player, lim[0], lim[1])
+        if best_move is None or sign * new_val < sign * val:
+          val, best_move = new_val, new_move
         if sign * (lim[1 - max_player] - val) >= 0:
+          self.cutoffs += 1
+          self.store_cutoff(new_move, opponent.color, depth)
           break
         lim[max_player] = sign * min(sign * lim[max_player], sign * val)
     self.gh.undo_move()
-
-    new_n = type('obj', (object,), {'lowerbound': -np.inf,
-                 'upperbound': np.inf, 'depth': depth})()
-    if n is None or new_n.depth > n.depth:
-      if val <= alpha:
-        new_n.upperbound = val
-      if val > alpha and val < beta:
-        new_n.lowerbound = val
-        new_n.upperbound = val
-      if val >= beta:
-        new_n.lowerbound = val
-      self.table[node_id] = new_n
+    if not self.aborted:
+      if best_move is not None:
+        best_move = transform(*best_move, sym, self.gh.size)
+      self.table.store(node_id, depth, val, alpha, beta, best_move)
     return val
 
   def mtdf(self, move, depth, f=0):
     """cf. https://en.wikipedia.org/wiki/MTD-f"""
     g, lower_bound, upper_bound = f, -np.inf, np.inf
     while lower_bound < upper_bound:
-      if time.time() - self.start >= MTDF_BREAKING_TIME:
-        return g
       beta = (g + 1) if g == lower_bound else g
       g = self.alpha_beta_memory(move, depth, True, beta - 1, beta)
+      if self.aborted:
+        return g
       if g < beta:
         upper_bound = g
       else:
         lower_bound = g
     return g
 
+  def pvs(self, move, depth, alpha=-np.inf, beta=np.inf):
+    """Principal variation search (cf.
+    https://www.chessprogramming.org/Principal_Variation_Search) from the root
+    move `move`, following the principal variation of the previous iteration
+    first."""
+    val = self.pvs_search(move, depth, True, alpha, beta,
+                          self.pv_lines.get(move, []))
+    if not self.aborted:
+      self.pv_lines[move] = self.pv_table.get(depth, [])
+    return val
+
+  def pvs_search(self, move, depth, max_player=True, alpha=-np.inf,
+                 beta=np.inf, pv=()):
+    """Same as alpha beta pruning, but only the first child gets the full
+    window: the other ones are searched with a null window, to prove that they
+    are not better than the best so far, and searched again with the full
+    window when they are.
+
+    Parameters
+    ----------
+    move: int, int
+      The last move being played in the position to be evaluated
+    depth: int
+      The maximum depth of the tree for lookahead in the minimax algorithm
+    max_player: bool
+      Are we maximizing or not?.
+    alpha: int
+      The current lower bound for the cutoff.
+    beta: int
+      The current upper bound for the cutoff.
+    pv: (int, int) list
+      Principal variation expected from this node, its first move being
+      searched first.
+
+    Return
+    ------
+    value: int
+      The estimated value of the current node (position) being evaluated.
+    """
+    if self.out_of_time():
+      return 0
+    player, opponent = self.return_players(max_player)
+    self.gh.do_move(move)
+    self.nodes_searched += 1
+    self.pv_table[depth] = []
+
+    # hardcoding forcing moves here to stop three exploring
+    if Rules.aligned_win(self.gh.board, player):
+      self.keep_scores(move)
+      self.gh.undo_move()
+      return SCORE['XXXXX'] if player.color == self.color else -SCORE['XXXXX']
+
+    if depth == 0:
+      val = self.quiescence(max_player, alpha, beta)
+    else:
+      sign = 1 if max_player else -1
+      val = sign * np.inf
+      lim = [alpha, beta]
+      null_val = self.null_move_value(self.pvs_search, depth, max_player, lim)
+      if null_val is not None and sign * (lim[1 - max_player] - null_val) >= 0:
+        self.cutoffs += 1
+        self.gh.undo_move()
+        return null_val
+      children = self.children(opponent.color, depth=depth,
+                               first=pv[0] if pv else None)
+      for idx, new_move in enumerate(children):
+        # null window on the better side of the bound to beat
+        bound = lim[max_player]
+        window = [bound - 1, bound] if max_player else [bound, bound + 1]
+        window[1 - max_player] = sign * max(sign * window[1 - max_player],
+                                            sign * lim[1 - max_player])
+        if idx == 0 or abs(bound) == np.inf:
+          window = lim
+        new_pv = pv[1:] if idx == 0 else ()
+        reduction = self.reduction(idx, depth, new_move, opponent.color)
+        new_val = self.pvs_search(new_move, depth - 1 - reduction,
+                                  1 - max_player, window[0], window[1], new_pv)
+        # the line below the child is only known from a full depth search
+        full = not reduction
+        if reduction and sign * new_val < sign * lim[max_player]:
+          new_val = self.pvs_search(new_move, depth - 1, 1 - max_player,
+                                    window[0], window[1])
+          full = True
+        if (window is not lim and
+                sign * lim[1 - max_player] < sign * new_val and
+                sign * new_val <= sign * window[1 - max_player]):
+          new_val = self.pvs_search(new_move, depth - 1, 1 - max_player,
+                                    lim[0], lim[1])
+        if sign * new_val < sign * val:
+          val = new_val
+          self.pv_table[depth] = [new_move] + (self.pv_table[depth - 1]
+                                               if full else [])
+        if sign * (lim[1 - max_player] - val) >= 0:
+          self.cutoffs += 1
+          self.store_cutoff(new_move, opponent.color, depth)
+          break
+        lim[max_player] = sign * min(sign * lim[max_player], sign * val)
+    self.gh.undo_move()
+    return val
+
   def alpha_beta_basic(self, move, depth, max_player=True, alpha=-np.inf,
                        beta=np.inf):
     """Same as alpha_beta, but only caring about aligning five.
@@ -425,8 +1091,11 @@ class MiniMaxAgent(Agent):
     value: int
       The estimated value of the current node (position) being evaluated.
     """
-    player, _ = self.return_players(max_player)
+    if self.out_of_time():
+      return 0
+    player, opponent = self.return_players(max_player)
     self.gh.basic_move(move)
+    self.nodes_searched += 1
 
     val = 0
     if depth == 0:
@@ -436,12 +1105,14 @@ class MiniMaxAgent(Agent):
       sign = 1 if max_player else -1
       val = sign * np.inf
       lim = [alpha, beta]
-      for new_move in self.gh.child_list[-8:]:
+      for new_move in self.children(opponent.color, 8, depth):
         val = sign * min(sign * val,
                          sign * self.alpha_beta_basic(new_move, depth - 1,
                                                       1 - max_player, lim[0],
                                                       lim[1]))
         if sign * (lim[1 - max_player] - val) >= 0:
+          self.cutoffs += 1
+          self.store_cutoff(new_move, opponent.color, depth)
           break
         lim[max_player] = sign * min(sign * lim[max_player], sign * val)
     self.gh.basic_undo()
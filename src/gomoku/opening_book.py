@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.minimax import MiniMaxAgent
+from gomoku.symmetry import transform
+
+BOOK_FILE = "book.bin"
+MAGIC = b'GMKB'
+VERSION = 1
+HEADER = np.dtype([('magic', 'S4'), ('version', '<u4'), ('count', '<u8')])
+RECORD = np.dtype([('key', '<u8'), ('x', 'u1'), ('y', 'u1'),
+                   ('count', '<u4'), ('value', '<f4')])
+# plies of the opening searched by the builder
+BOOK_PLIES = 4
+# best moves of every position followed by the builder
+BOOK_WIDTH = 3
+# depth of the searches of the builder
+BOOK_DEPTH = 3
+
+
+class OpeningBook(object):
+  """Class OpeningBook. Moves of the opening positions, read from a binary
+  file written by OpeningBookBuilder.
+
+  The file is a header followed by fixed-size records (key, x, y, count,
+  value), sorted by key and then by decreasing value. The key is the
+  canonical hash of the position (cf. GameHandler.canonical_hash) and the move
+  is given in the canonical orientation, so a position is found whichever of
+  its 8 symmetric images is on the board. The records are memory-mapped and
+  binary searched.
+
+  Parameters
+  ----------
+  filename: str (Default: BOOK_FILE)
+    The file of the book.
+
+  Attributes
+  ----------
+  records: numpy.memmap
+    The records of the book.
+  """
+  def __init__(self, filename=BOOK_FILE):
+    self.filename = filename
+    header = np.fromfile(filename, dtype=HEADER, count=1)
+    if len(header) == 0 or header[0]['magic'] != MAGIC:
+      raise ValueError(f"{filename} is not an opening book file")
+    count = int(header[0]['count'])
+    if count:
+      self.records = np.memmap(filename, dtype=RECORD, mode='r',
+                               offset=HEADER.itemsize, shape=(count,))
+    else:
+      self.records = np.zeros(0, dtype=RECORD)
+
+  @staticmethod
+  def write(filename, records):
+    """Writes the `records` (sorted by key) as the book `filename`."""
+    header = np.array([(MAGIC, VERSION, len(records))], dtype=HEADER)
+    path = filename + '.tmp'
+    with open(path, 'wb') as f:
+      f.write(header.tobytes())
+      f.write(records.tobytes())
+    os.replace(path, filename)
+
+  def __len__(self):
+    return len(self.records)
+
+  def moves(self, gh):
+    """Moves of the current position of the game handler, best first.
+
+    Return
+    ------
+    moves: list
+      (move, count, value) for every move of the position in the book: the
+      move in the orientation of the board, the number of lines of the
+      builder playing it and its search value for the side to move.
+    """
+    key, sym = gh.canonical_hash()
+    keys = self.records['key']
+    start = np.searchsorted(keys, np.uint64(key), side='left')
+    end = np.searchsorted(keys, np.uint64(key), side='right')
+    return [(transform(int(record['x']), int(record['y']), sym, gh.size,
+                       inverse=True),
+             int(record['count']), float(record['value']))
+            for record in self.records[start:end]]
+
+  def lookup(self, gh):
+    """Best move of the current position of the game handler (None if it is
+    not in the book)."""
+    if not len(self.records):
+      return None
+    moves = self.moves(gh)
+    return moves[0][0] if moves else None
+
+
+class OpeningBookBuilder(object):
+  """Class OpeningBookBuilder. Builds an opening book by self-play of
+  MiniMaxAgents searching to a fixed depth.
+
+  From the empty board, the agent to move searches every position of the
+  first `plies` plies, and the lines go on with each of its `width` best root
+  moves (its choice first). Positions are identified by their canonical hash,
+  so symmetric positions are searched once and only one of the root moves
+  leading to symmetric positions is kept. Every root move is recorded with
+  its value, and with the number of lines that played it.
+
+  Parameters
+  ----------
+  plies: int (Default: BOOK_PLIES)
+    Number of plies of the opening in the book.
+  width: int (Default: BOOK_WIDTH)
+    Number of moves followed from every position.
+  depth: int (Default: BOOK_DEPTH)
+    Depth of the searches.
+  algorithm_name: str (Default: 'alpha_beta_memory')
+    The minimax flavour of the agents.
+
+  Attributes
+  ----------
+  stats: dict
+    stats[key][move] is the [count, value] of move (in the canonical
+    orientation) in the position of canonical hash key.
+  positions_searched: int
+    Number of searches run by the last build.
+  """
+  def __init__(self, plies=BOOK_PLIES, width=BOOK_WIDTH, depth=BOOK_DEPTH,
+               algorithm_name='alpha_beta_memory'):
+    self.plies = plies
+    self.width = width
+    self.depth = depth
+    self.algorithm_name = algorithm_name
+    self.stats = {}
+    self.positions_searched = 0
+
+  def agent(self, color):
+    """Agent searching to depth, whatever time it takes."""
+    agent = MiniMaxAgent(color, self.depth,
+                         algorithm_name=self.algorithm_name)
+    agent.time_limit = np.inf
+    # the opening has no forced win worth a proof-number search
+    agent.proof_number = False
+    return agent
+
+  def build(self):
+    """Runs the self-play and returns the records of the book."""
+    self.stats, self.positions_searched = {}, 0
+    gh = GameHandler(Board(), [self.agent(1), self.agent(2)])
+    self.expand(gh, 0)
+    records = [(key, x, y, count, value)
+               for key, moves in self.stats.items()
+               for (x, y), (count, value) in moves.items()]
+    records = np.array(records, dtype=RECORD)
+    return records[np.lexsort((-records['value'], records['key']))]
+
+  def search(self, gh):
+    """Root moves of the current position and their values, best first, but
+    for moves leading to a position symmetric to the one of a better move."""
+    agent = gh.players[gh.current]
+    choice = agent.find_move(gh)
+    self.positions_searched += 1
+    values = dict(agent.root_values)
+    values.setdefault(choice, max(values.values(), default=0))
+    # the chosen move is first among equal values
+    moves, children = [], set()
+    for move, value in sorted(values.items(),
+                              key=lambda item: (-item[1], item[0] != choice)):
+      gh.do_move(move)
+      child = gh.canonical_hash()[0]
+      gh.undo_move()
+      if child not in children:
+        children.add(child)
+        moves.append((move, value))
+    return moves
+
+  def expand(self, gh, ply):
+    """Searches the current position and goes on with its best moves."""
+    if ply == self.plies or gh.winner is not None:
+      return
+    key, sym = gh.canonical_hash()
+    moves = self.stats.get(key)
+    if moves is None:
+      moves = self.stats[key] = {
+          transform(*move, sym, gh.size): [0, value]
+          for move, value in self.search(gh)}
+    best = sorted(moves.items(), key=lambda item: -item[1][1])
+    for move, stats in best[:self.width]:
+      stats[0] += 1
+      gh.do_move(transform(*move, sym, gh.size, inverse=True))
+      self.expand(gh, ply + 1)
+      gh.undo_move()
+
+  def write(self, filename=BOOK_FILE):
+    """Builds the book and writes it to `filename`."""
+    OpeningBook.write(filename, self.build())
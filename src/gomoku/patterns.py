@@ -0,0 +1,227 @@
+import numpy as np
+
+from gomoku.utils import SLOPES
+
+EMPTY, WALL = 0, 3
+BITS = 2
+PAD = 5
+CELL_MASK = (1 << BITS) - 1
+
+MAX_SEGMENTS = 1 << 16
+
+_GEOMETRIES = {}
+_SEGMENTS = {}
+
+
+def window_mask(length):
+  """Mask of a window of `length` cells."""
+  return (1 << (BITS * length)) - 1
+
+
+def walls(length):
+  """Code of an empty line of `length` cells, with PAD walls on each side."""
+  code = 0
+  for slot in list(range(PAD)) + list(range(PAD + length, 2 * PAD + length)):
+    code |= WALL << (BITS * slot)
+  return code
+
+
+def decode(code, length):
+  """List of the `length` cells packed in `code`, first cell first."""
+  return [(code >> (BITS * i)) & CELL_MASK for i in range(length)]
+
+
+def window_codes(positions, before=1, after=4):
+  """Code of the window from `before` intersections before to `after` ones
+  after every intersection, for every slope, using shifted views of the
+  positions padded with walls.
+
+  Parameters
+  ----------
+  positions: numpy.ndarray
+    Board positions, of shape (..., size, size).
+
+  Return
+  ------
+  codes: numpy.ndarray
+    Codes of shape (..., len(SLOPES), size, size).
+  """
+  size = positions.shape[-1]
+  padded = np.full(positions.shape[:-2] + (size + 2 * PAD, size + 2 * PAD),
+                   WALL, dtype=np.int64)
+  padded[..., PAD:PAD + size, PAD:PAD + size] = positions
+  codes = np.zeros(positions.shape[:-2] + (len(SLOPES), size, size),
+                   dtype=np.int64)
+  for d, (dx, dy) in enumerate(SLOPES):
+    for i in range(before + after + 1):
+      x, y = PAD + (i - before) * dx, PAD + (i - before) * dy
+      codes[..., d, :, :] |= padded[..., x:x + size, y:y + size] << (BITS * i)
+  return codes
+
+
+def geometry(size):
+  """Rows, columns and diagonals of a board of size `size`.
+
+  Return
+  ------
+  cells: (int, int) list list
+    cells[l] are the intersections of line l, following its slope.
+  directions: int list
+    directions[l] is the index in SLOPES of the slope of line l.
+  through: (int, int) list 2D list
+    through[x][y][d] is (l, shift) for the line l going through (x, y) with
+    slope SLOPES[d], (x, y) being stored at bit `shift` of the code of l.
+  """
+  if size not in _GEOMETRIES:
+    cells, directions = [], []
+    through = [[[] for _ in range(size)] for _ in range(size)]
+    for d, (dx, dy) in enumerate(SLOPES):
+      for x in range(size):
+        for y in range(size):
+          if 0 <= x - dx < size and 0 <= y - dy < size:
+            continue
+          line, _x, _y = [], x, y
+          while 0 <= _x < size and 0 <= _y < size:
+            through[_x][_y].append((len(cells), BITS * (PAD + len(line))))
+            line.append((_x, _y))
+            _x, _y = _x + dx, _y + dy
+          cells.append(line)
+          directions.append(d)
+    _GEOMETRIES[size] = cells, directions, through
+  return _GEOMETRIES[size]
+
+
+class Lines(object):
+  """Class Lines. Every row, column and diagonal of the board, each one packed
+  into an int with 2 bits per intersection (EMPTY, 1, 2) and PAD walls on both
+  sides.
+
+  Parameters
+  ----------
+  size: int (Default: 19)
+    Size of the board.
+
+  Attributes
+  ----------
+  codes: int list
+    codes[l] is the current code of line l.
+  lengths: int list
+    lengths[l] is the number of intersections of line l.
+  """
+  def __init__(self, size=19):
+    self.size = size
+    self.cells, self.directions, self.through = geometry(size)
+    self.lengths = [len(line) for line in self.cells]
+    self.reset()
+
+  def reset(self):
+    """Empty every line."""
+    self.codes = [walls(length) for length in self.lengths]
+
+  def add(self, x, y, delta):
+    """Add `delta` to the value of (x, y) in the four lines going through it."""
+    for line, shift in self.through[x][y]:
+      self.codes[line] += delta << shift
+
+  def window(self, x, y, d, before=1, after=4):
+    """Code of the cells from `before` cells before (x, y) to `after` cells
+    after it, on the line of slope SLOPES[d] going through (x, y)."""
+    line, shift = self.through[x][y][d]
+    return ((self.codes[line] >> (shift - BITS * before)) &
+            window_mask(before + after + 1))
+
+
+class WindowTracker(object):
+  """Class WindowTracker. Base class of the structures that keep, for every
+  intersection and slope, a value computed from the code of the
+  2 * reach + 1 intersections around it on that line.
+
+  When an intersection changes, only the intersections within `reach` of it on
+  its four lines can change value, so only those are recomputed. The values
+  of such a segment only depend on the cells within 2 * reach of the changed
+  intersection, so they are cached by the code of those cells. Subclasses set
+  `reach` (at most PAD), `blank` (the value of an intersection that does not
+  count) and `evaluate(window)`, and can be notified of the changed values by
+  overriding `changed(x, y, d, old, new)`.
+
+  Parameters
+  ----------
+  board: Board
+    The board, whose line codes are read.
+
+  Attributes
+  ----------
+  values: list
+    values[l][k] is the value of the k-th intersection of line l.
+  """
+  reach = 0
+  blank = None
+
+  def __init__(self, board):
+    self.board = board
+    self.segments = _SEGMENTS.setdefault(type(self), {})
+    self.notify = type(self).changed is not WindowTracker.changed
+    self.reset()
+
+  def reset(self):
+    """Recompute every intersection from scratch."""
+    self.lines = self.board.lines
+    self.clear()
+    self.values = [[None] * length for length in self.lines.lengths]
+    for line, length in enumerate(self.lines.lengths):
+      for k, value in enumerate(self.segment(line, 0, length)):
+        self.values[line][k] = value
+        if value != self.blank:
+          x, y = self.lines.cells[line][k]
+          self.changed(x, y, self.lines.directions[line], self.blank, value)
+
+  def clear(self):
+    """Reset what the subclass aggregates from the values."""
+    pass
+
+  def evaluate(self, window):
+    """Value of the intersection at the center of `window`."""
+    raise NotImplementedError
+
+  def changed(self, x, y, d, old, new):
+    """Called when the value of (x, y) on slope SLOPES[d] changed."""
+    pass
+
+  def segment(self, line, start, end):
+    """Values of the intersections `start` to `end` (excluded) of line."""
+    reach, nb_cells = self.reach, end - start
+    code = ((self.lines.codes[line] >> (BITS * (PAD + start - reach))) &
+            window_mask(nb_cells + 2 * reach))
+    key = (code, nb_cells)
+    values = self.segments.get(key)
+    if values is None:
+      if len(self.segments) >= MAX_SEGMENTS:
+        self.segments.clear()
+      mask = window_mask(2 * reach + 1)
+      values = [self.evaluate((code >> (BITS * i)) & mask)
+                for i in range(nb_cells)]
+      self.segments[key] = values
+    return values
+
+  def value(self, x, y, d):
+    """Value of (x, y) on slope SLOPES[d]."""
+    line, shift = self.lines.through[x][y][d]
+    return self.values[line][shift // BITS - PAD]
+
+  def update(self, x, y):
+    """Update the intersections around (x, y) after it changed."""
+    reach, lines, notify = self.reach, self.lines, self.notify
+    for d, (line, shift) in enumerate(lines.through[x][y]):
+      k = shift // BITS - PAD
+      start = max(0, k - reach)
+      end = min(lines.lengths[line], k + reach + 1)
+      values, segment = self.values[line], self.segment(line, start, end)
+      if values[start:end] == segment:
+        continue
+      if notify:
+        cells = lines.cells[line]
+        for k, new in enumerate(segment, start):
+          old = values[k]
+          if new != old:
+            self.changed(*cells[k], d, old, new)
+      values[start:end] = segment
@@ -0,0 +1,119 @@
+from gomoku.captures import CAPTURE_REACH, slope_captures
+from gomoku.patterns import (BITS, CELL_MASK, EMPTY, PAD, WindowTracker,
+                             decode, window_mask)
+
+PRIORITY_REACH = 4
+# weight of a five-window holding 0 to 4 stones of a color (and no other one)
+FIVE_WEIGHTS = [0, 1, 8, 64, 4096]
+CAPTURE_WEIGHT = 48
+ATTACK_WEIGHT = 2
+
+_SLOPE_PRIORITIES = {}
+_SLOPE_ALIGNMENTS = {}
+
+
+def slope_priorities(window):
+  """Threat level of a stone of each color at the center of `window` (the code
+  of the 2 * PRIORITY_REACH + 1 intersections around it on a line): the
+  weights of the five-windows through the center it would extend, plus the
+  captures it would make (none if the center is not empty), cached by
+  window."""
+  levels = _SLOPE_PRIORITIES.get(window)
+  if levels is None:
+    levels = (0, 0)
+    if (window >> (BITS * PRIORITY_REACH)) & CELL_MASK == EMPTY:
+      cells = decode(window, 2 * PRIORITY_REACH + 1)
+      captures = slope_captures(
+          (window >> (BITS * (PRIORITY_REACH - CAPTURE_REACH))) &
+          window_mask(2 * CAPTURE_REACH + 1))
+      levels = ()
+      for color, sides in zip([1, 2], captures):
+        level = CAPTURE_WEIGHT * len(sides)
+        for i in range(5):
+          five = cells[PRIORITY_REACH - i:PRIORITY_REACH - i + 5]
+          if all(cell in [EMPTY, color] for cell in five):
+            level += FIVE_WEIGHTS[five.count(color)]
+        levels += (level,)
+    _SLOPE_PRIORITIES[window] = levels
+  return levels
+
+
+def slope_alignments(window):
+  """Most stones of each color in a five-window through the center of
+  `window` (the code of the 2 * PRIORITY_REACH + 1 intersections around it on
+  a line) holding no stone of the other color, i.e. the number of stones a
+  stone of that color at the center would align (none if the center is not
+  empty), cached by window."""
+  alignments = _SLOPE_ALIGNMENTS.get(window)
+  if alignments is None:
+    alignments = (0, 0)
+    if (window >> (BITS * PRIORITY_REACH)) & CELL_MASK == EMPTY:
+      cells = decode(window, 2 * PRIORITY_REACH + 1)
+      alignments = tuple(
+          max([cells[PRIORITY_REACH - i:PRIORITY_REACH - i + 5].count(color)
+               for i in range(5)
+               if all(cell in [EMPTY, color]
+                      for cell in cells[PRIORITY_REACH - i:
+                                        PRIORITY_REACH - i + 5])],
+              default=0)
+          for color in [1, 2])
+    _SLOPE_ALIGNMENTS[window] = alignments
+  return alignments
+
+
+class MovePriorities(WindowTracker):
+  """Class MovePriorities. Cheap estimate of how urgent every empty
+  intersection is for each color, used to order the moves in the searches.
+
+  A stone of color at (x, y) gets the threat level of its own patterns
+  (ATTACK_WEIGHT times) plus the one of the opponent patterns it blocks, each
+  of them only depending on the PRIORITY_REACH intersections on each side of
+  it on each line. The threat levels are kept up to date, the priorities are
+  only summed when sorting moves.
+
+  Parameters
+  ----------
+  board: Board
+    The board, whose line codes are read.
+
+  Attributes
+  ----------
+  values: list
+    values[l][k] are the threat levels of both colors at the k-th
+    intersection of line l.
+  """
+  reach = PRIORITY_REACH
+  evaluate = staticmethod(slope_priorities)
+  blank = (0, 0)
+
+  def priority(self, x, y, color):
+    """Priority of (x, y) for color."""
+    mine = theirs = 0
+    for line, shift in self.lines.through[x][y]:
+      levels = self.values[line][shift // BITS - PAD]
+      mine, theirs = mine + levels[color - 1], theirs + levels[2 - color]
+    return ATTACK_WEIGHT * mine + theirs
+
+  def completes_five(self, x, y, color):
+    """Return True if a stone of color at (x, y) would align five."""
+    for line, shift in self.lines.through[x][y]:
+      if self.values[line][shift // BITS - PAD][color - 1] >= FIVE_WEIGHTS[4]:
+        return True
+    return False
+
+  def alignment(self, x, y, color):
+    """Most stones a stone of color at (x, y) would align with in a
+    five-window (3 if it would make a four, 4 if it would align five), only
+    counted on the lines whose threat level allows a four (less than 3 if
+    none does)."""
+    best = 0
+    for d, (line, shift) in enumerate(self.lines.through[x][y]):
+      if self.values[line][shift // BITS - PAD][color - 1] >= FIVE_WEIGHTS[3]:
+        window = self.lines.window(x, y, d, PRIORITY_REACH, PRIORITY_REACH)
+        best = max(best, slope_alignments(window)[color - 1])
+    return best
+
+  def sort(self, moves, color):
+    """Sort `moves` by decreasing priority for color (stable)."""
+    return sorted(moves, key=lambda move: self.priority(*move, color),
+                  reverse=True)
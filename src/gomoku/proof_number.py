@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+
+from gomoku.rules import Rules
+from gomoku.utils import opposite
+
+# proof and disproof numbers of solved positions
+PN_INFINITY = 10 ** 9
+# maximum number of moves played by a search
+PN_NODES = 100000
+# moves of the attacker tried when the defender makes no threat
+PN_CHILD = 12
+
+
+class ProofNumberSearch(object):
+  """Class ProofNumberSearch. Proves or disproves a win of the side to move
+  with depth-first proof-number search (df-pn, cf.
+  https://www.chessprogramming.org/Proof-Number_Search#DFPN).
+
+  Every position gets a proof number (the least number of positions to solve
+  to prove the win) and a disproof number (same for the refutation). The
+  attacker proves a position with one proven move, the defender disproves it
+  with one disproven move. The search always expands the most proving
+  position, only leaving a subtree once its numbers reach the thresholds
+  given by its parent, and keeps the numbers of the positions it left in a
+  table.
+
+  Positions are ended by Rules.check_winner after every move. When the
+  attacker threatens to align five, the defender only tries the blocks, its
+  captures and its own fives; else it tries every move of the child list.
+  The attacker only tries the `max_child` moves of highest priority (or the
+  answers to a five threat), so a disproof means that none of them wins.
+
+  Parameters
+  ----------
+  gh: GameHandler
+    The game handler of the position, color being to move.
+  color: int
+    The color of the attacker.
+  max_nodes: int (Default: PN_NODES)
+    Maximum number of moves played by a search.
+  max_child: int (Default: PN_CHILD)
+    Moves of the attacker tried when the defender makes no threat.
+
+  Attributes
+  ----------
+  table: dict
+    table[key] are the proof and disproof numbers of the position of
+    Zobrist hash key (cf. child_key).
+  nodes_searched: int
+    Number of moves played by the last solve.
+  deadline: float
+    Time after which the search is aborted.
+  aborted: bool
+    True once the search passed the deadline or the node budget.
+  """
+  def __init__(self, gh, color, max_nodes=PN_NODES, max_child=PN_CHILD):
+    self.gh = gh
+    self.color = color
+    self.max_nodes = max_nodes
+    self.max_child = max_child
+    self.table = {}
+    self.nodes_searched = 0
+    self.deadline = np.inf
+    self.aborted = False
+
+  def solve(self, deadline=np.inf):
+    """Searches the current position until it is solved, the node budget is
+    spent or the deadline is passed.
+
+    Return
+    ------
+    result: bool
+      True if the win is proven, False if disproven, None if unknown.
+    move: (int, int)
+      The winning move if the win is proven, else the most proving move
+      (None if no move was searched).
+    """
+    self.deadline, self.aborted = deadline, False
+    self.nodes_searched = 0
+    key = self.gh.hash
+    self.mid(key, True, PN_INFINITY, PN_INFINITY)
+    pn, dn = self.table.get(key, (1, 1))
+    result = True if pn == 0 else False if dn == 0 else None
+    move = None
+    children = self.children(True)
+    if children:
+      move = min(children, key=lambda move: self.table.get(
+          self.child_key(move), (1, 1))[0])
+    return result, move
+
+  def out_of_time(self):
+    """Return True (from then on) once the search passed the deadline or the
+    node budget."""
+    if not self.aborted and (self.nodes_searched >= self.max_nodes or
+                             time.time() >= self.deadline):
+      self.aborted = True
+    return self.aborted
+
+  def child_key(self, move):
+    """Zobrist hash of the position after the player to move plays move
+    (the hash GameHandler.do_move would give, captures included)."""
+    gh, zobrist = self.gh, self.gh.zobrist
+    player = gh.players[gh.current]
+    key = gh.hash ^ zobrist.stone(*move, player.color) ^ zobrist.side
+    captured = gh.threats.captures(*move, player.color)
+    if captured:
+      opponent = opposite(player.color)
+      for x, y in captured:
+        key ^= zobrist.stone(x, y, opponent)
+      key ^= (zobrist.capture(gh.current, player.captures) ^
+              zobrist.capture(gh.current, player.captures + len(captured)))
+    return key
+
+  def fives(self, color):
+    """Intersections where color would align five."""
+    alignment = self.gh.priorities.alignment
+    return [move for move in self.gh.child_list
+            if alignment(*move, color) == 4]
+
+  def children(self, attacker):
+    """Moves searched from the current position, the attacker being to move
+    if `attacker`, best first."""
+    gh = self.gh
+    color = self.color if attacker else opposite(self.color)
+    forbidden = gh.forbidden.forbidden[color]
+    fives = self.fives(color)
+    blocks = self.fives(opposite(color))
+    if blocks and not fives:
+      moves = blocks + [move for move in gh.threats.capturing[color]
+                        if move not in blocks]
+    else:
+      moves = gh.priorities.sort(gh.child_list, color)
+      moves = fives + [move for move in moves if move not in fives]
+      if attacker:
+        moves = moves[:self.max_child]
+    return [move for move in moves if move not in forbidden]
+
+  def play(self, move):
+    """Plays move, returning the winner (None if the game goes on) and the
+    state Rules.check_winner changes, restored by undo."""
+    gh = self.gh
+    flags = [player.aligned_five_prev for player in gh.players]
+    gh.do_move(move)
+    self.nodes_searched += 1
+    return Rules.check_winner(gh.board, gh.players, gh.threats), flags
+
+  def undo(self, flags):
+    self.gh.undo_move()
+    for player, flag in zip(self.gh.players, flags):
+      player.aligned_five_prev = flag
+
+  def mid(self, key, attacker, pn_threshold, dn_threshold):
+    """Expands the current position (of key), the attacker being to move if
+    `attacker`, until its proof number reaches pn_threshold or its disproof
+    number reaches dn_threshold, and stores its numbers."""
+    children = self.children(attacker)
+    keys = [self.child_key(move) for move in children]
+    while True:
+      numbers = [self.table.get(child_key, (1, 1)) for child_key in keys]
+      # the player to move needs one child for its own number (the proof
+      # number for the attacker), and all of them for the other one
+      own = [number[1 - attacker] for number in numbers]
+      other = [number[attacker] for number in numbers]
+      best = int(np.argmin(own)) if own else None
+      own_min = own[best] if own else PN_INFINITY
+      other_sum = min(sum(other), PN_INFINITY) if own else 0
+      pn, dn = (own_min, other_sum) if attacker else (other_sum, own_min)
+      if (pn >= pn_threshold or dn >= dn_threshold or pn == 0 or dn == 0 or
+              self.out_of_time()):
+        break
+      # the best child is searched until it gets worse than the second best
+      # one, or the other number of the node reaches its threshold
+      second = min(own[:best] + own[best + 1:], default=PN_INFINITY)
+      own_threshold, other_threshold = ((pn_threshold, dn_threshold)
+                                        if attacker else
+                                        (dn_threshold, pn_threshold))
+      child_own = min(own_threshold, second + 1)
+      child_other = other_threshold - other_sum + other[best]
+      child_pn, child_dn = ((child_own, child_other) if attacker else
+                            (child_other, child_own))
+      winner, flags = self.play(children[best])
+      if winner is not None:
+        won = winner.color == self.color
+        self.table[keys[best]] = (0, PN_INFINITY) if won else (PN_INFINITY, 0)
+      else:
+        self.mid(keys[best], not attacker, child_pn, child_dn)
+      self.undo(flags)
+    if not self.aborted or pn == 0 or dn == 0:
+      self.table[key] = (pn, dn)
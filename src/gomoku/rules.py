@@ -1,6 +1,86 @@
 import numpy as np
 
-from gomoku.utils import SLOPES, all_equal, coordinates, indefensible_four
+from gomoku.patterns import BITS, EMPTY, WALL, decode, window_codes
+from gomoku.utils import SLOPES, all_equal, coordinates
+
+THREES_REACH = 5
+CENTER_SHIFT = BITS * THREES_REACH
+CENTER_MASK = 3 << CENTER_SHIFT
+
+DIRECTIONS = [tuple(slope)
+              for slope in np.append(SLOPES, -SLOPES, axis=0).tolist()]
+
+_SLOPE_THREES = {}
+_SLOPE_FIVES = {}
+
+
+def indefensible_four(cells, color):
+  """Number of empty inner intersections of the seven `cells` (intersection
+  values on a line) where a stone of color would make a four that cannot be
+  defended (open at both ends)."""
+  indefensibles = 0
+  for i in range(1, 6):
+    if cells[i] != EMPTY:
+      continue
+    same, empty = 0, 0
+    for j, cell in enumerate(cells):
+      if i == j:
+        cell = color
+      if cell == EMPTY:
+        if same == 0:
+          empty = 1
+          continue
+        elif same == 4:
+          empty += 1
+        break
+      elif cell == color:
+        same += 1
+      elif same == 0:
+        continue
+      else:
+        break
+    if same >= 4 and empty >= 2:
+      indefensibles += 1
+  return indefensibles
+
+
+def slope_threes(window, color):
+  """Number of free threes going through the center of `window` (the code of
+  the 2 * THREES_REACH + 1 intersections around a stone of color on a line),
+  cached by window."""
+  key = (window, color)
+  if key not in _SLOPE_THREES:
+    cells = decode(window, 2 * THREES_REACH + 1)
+    fives = []
+    for i in range(5):
+      five = cells[THREES_REACH - i:THREES_REACH - i + 5]
+      if WALL in five:
+        continue
+      if five.count(EMPTY) == 2 and five.count(color) == 3:
+        fives.append(i)
+    threes = 0
+    for idx, i in enumerate(fives):
+      seven = cells[THREES_REACH - i - 1:THREES_REACH - i + 6]
+      if WALL in seven:
+        continue
+      indefensibles = indefensible_four(seven, color)
+      if indefensibles > 0:
+        threes += indefensibles
+        if not (idx == 0 and len(fives) == 5):
+          break
+    _SLOPE_THREES[key] = threes
+  return _SLOPE_THREES[key]
+
+
+def slope_five(window, color):
+  """Return True if there are five stones of color in a row going through the
+  center of `window` (the code of the 9 intersections around it on a line),
+  cached by window."""
+  key = (window, color)
+  if key not in _SLOPE_FIVES:
+    cells = decode(window, 9)
+    _SLOPE_FIVES[key] = any(cells[i:i + 5] == [color] * 5 for i in range(5))
+  return _SLOPE_FIVES[key]
 
 
 class Rules(object):
@@ -14,6 +94,26 @@ class Rules(object):
     player.last_move = (x, y)
     return len(Rules.capture(board, player, remove=False)) > 0
 
+  @staticmethod
+  def captures_at(board, x, y, color):
+    """Stones that a stone of color at (x, y) would capture. The board is only
+    read, never modified."""
+    size, captures = board.size, []
+    for dx, dy in DIRECTIONS:
+      bounds = x + 3 * dx, y + 3 * dy
+      if not (0 <= bounds[0] < size and 0 <= bounds[1] < size):
+        continue
+      if not board.is_stone(*bounds, color):
+        continue
+      stone1 = ((x + dx), (y + dy))
+      stone2 = ((x + dx * 2), (y + dy * 2))
+      if not board.is_stone(*stone1, color)     \
+         and not board.is_stone(*stone2, color) \
+         and not board.is_empty(*stone1)        \
+         and not board.is_empty(*stone2):
+        captures += [stone1, stone2]
+    return captures
+
   @staticmethod
   def capture(board, player, remove=True):
     """Manage the Capture Rule
@@ -34,22 +134,7 @@ class Rules(object):
     captures: list
       List of coordinates for the captured stones
     """
-    coords = np.append(SLOPES, SLOPES * -1, axis=0)
-    (x, y), size = player.last_move, board.size
-    captures = []
-    for dx, dy in coords:
-      bounds = x + 3 * dx, y + 3 * dy
-      if not (0 <= bounds[0] < size and 0 <= bounds[1] < size):
-        continue
-      if board.board[bounds[0]][bounds[1]] != player.color:
-        continue
-      stone1 = ((x + dx), (y + dy))
-      stone2 = ((x + dx * 2), (y + dy * 2))
-      if not board.is_stone(*stone1, player.color)     \
-         and not board.is_stone(*stone2, player.color) \
-         and not board.is_empty(*stone1)         \
-         and not board.is_empty(*stone2):
-        captures += [stone1, stone2]
+    captures = Rules.captures_at(board, *player.last_move, player.color)
     if remove:
       for stone in captures:
         board.remove(*stone)
@@ -68,11 +153,12 @@ class Rules(object):
       The current player
     """
     x, y = player.last_move
-    for dx, dy in SLOPES:
-      for _x, _y in coordinates(x, y, -dx, -dy, 5):
-        if all_equal(coordinates(_x, _y, dx, dy, 5), board.board, player.color):
-          return True
-    return False
+    if hasattr(board, 'aligned_five'):
+      return board.aligned_five(player.color, x, y)
+    if not (0 <= x < board.size and 0 <= y < board.size):
+      return False
+    return any(slope_five(board.lines.window(x, y, d, 4, 4), player.color)
+               for d in range(len(SLOPES)))
 
   @staticmethod
   def aligned_coords(board, player):
@@ -85,25 +171,14 @@ class Rules(object):
     return []
 
   @staticmethod
-  def check_double_threes(board, threes_dict, color):
+  def double_threes(board, x, y, color):
+    """Number of free-three alignments that a stone of color at (x, y) would
+    introduce. The board is only read, never modified."""
     threes = 0
-    for lst in threes_dict.values():
-      for i in range(len(lst)):
-        l = lst[i]
-        offset = l[0] - l[1]
-        new_lst = np.append([l[0] + offset], l, axis=0)
-        new_lst = np.append(new_lst, [l[-1] - offset], axis=0)
-        if (new_lst >= [board.size, board.size]).any():
-          continue
-        if (new_lst < [0, 0]).any():
-          continue
-        indefensibles = indefensible_four(board, new_lst, color)
-        if indefensibles > 0:
-          threes += indefensibles
-          if i == 0 and len(lst) == 5:
-            i = 3
-          else:
-            break
+    for d in range(len(SLOPES)):
+      window = board.lines.window(x, y, d, THREES_REACH, THREES_REACH)
+      threes += slope_threes(window & ~CENTER_MASK | color << CENTER_SHIFT,
+                             color)
     return threes
 
   @staticmethod
@@ -118,56 +193,82 @@ class Rules(object):
     player: Player
       The current player
     """
-    (x, y), threes, size = player.last_move, {}, board.size
-    for idx, (dx, dy) in enumerate(SLOPES):
-      i = 0
-      threes[idx] = []
-      while i != 5:
-        _x, _y = (x - i * dx), (y - i * dy)
-        bound_x, bound_y = (_x + dx * 4), (_y + dy * 4)
-        if (_x < 0 or _x >= size or _y < 0 or _y >= size or
-            bound_x < 0 or bound_x >= size or bound_y < 0 or bound_y >= size):
-          i += 1
-          continue
-        free = same = 0
-        coords = coordinates(_x, _y, dx, dy)
-        for j in range(5):
-          v, w = coords[j]
-          same += board.is_stone(v, w, player.color)
-          free += board.is_empty(v, w)
-        if free == 2 and same == 3:
-          threes[idx].append(np.array(coords))
-        i += 1
-    return Rules.check_double_threes(board, threes, player.color) <= 1
+    return Rules.double_threes(board, *player.last_move, player.color) <= 1
 
   @staticmethod
-  def check_captures(board, player):
-    for x in range(board.size):
-      for y in range(board.size):
-        if Rules.can_capture(board, x, y, player):
-          return True
-    return False
+  def forbidden_mask(board, color):
+    """Manage the No Double Free Threes Rule for every intersection at once.
+
+    Parameters
+    ----------
+    board: Board
+      The current board
+    color: int
+      The color of the player
+
+    Return
+    ------
+    mask: numpy.ndarray
+      Boolean array, True where color is not allowed to play.
+    """
+    position = np.asarray(board.board)
+    windows = window_codes(position, THREES_REACH, THREES_REACH)
+    windows = windows & ~CENTER_MASK | color << CENTER_SHIFT
+    codes, inverse = np.unique(windows, return_inverse=True)
+    threes = np.array([slope_threes(int(code), color) for code in codes])
+    threes = threes[inverse.reshape(windows.shape)].sum(axis=0)
+    return (position == 0) & (threes > 1)
+
+  @staticmethod
+  def capturing_moves(board, color, threats=None):
+    """Empty intersections where color would capture, looked up in the
+    CaptureThreats index `threats` if given, else found by a scan."""
+    if threats is not None:
+      return threats.capturing[color]
+    return [(x, y) for x in range(board.size) for y in range(board.size)
+            if board.is_empty(x, y) and Rules.captures_at(board, x, y, color)]
 
   @staticmethod
-  def can_break_five(board, player, opponent):
+  def check_captures(board, player, threats=None):
+    return len(Rules.capturing_moves(board, player.color, threats)) > 0
+
+  @staticmethod
+  def can_break_five(board, player, opponent, threats=None):
     """Assuming that there are five aligned, returns True if player can break
     all the five alignments from his opponent."""
-    aligned = Rules.aligned_coords(board, opponent)
-    for x in range(board.size):
-      for y in range(board.size):
-        if board.is_empty(x, y):
-          player.last_move = (x, y)
-          captures = Rules.capture(board, player, remove=False)
-          if len(set(captures) & set(aligned)):
-            return True
+    aligned = set(Rules.aligned_coords(board, opponent))
+    for x, y in Rules.capturing_moves(board, player.color, threats):
+      if threats is not None:
+        captures = threats.captures(x, y, player.color)
+      else:
+        captures = Rules.captures_at(board, x, y, player.color)
+      if len(set(captures) & aligned):
+        return True
     return False
 
   @staticmethod
-  def can_reach_ten(board, player):
-    return player.captures >= 8 and Rules.check_captures(board, player)
+  def can_reach_ten(board, player, threats=None):
+    return player.captures >= 8 and Rules.check_captures(board, player, threats)
 
   @staticmethod
-  def check_winner(board, players):
+  def check_winner(board, players, threats=None):
+    """Manage the winning conditions (ten captures, or five aligned that the
+    opponent cannot break by a capture nor answer by reaching ten captures).
+
+    Parameters
+    ----------
+    board: Board
+      The current board
+    players: list
+      The two players
+    threats: CaptureThreats (Default: None)
+      Index of the capturing moves of the position, scanned for if None.
+
+    Return
+    ------
+    winner: Player
+      The winner, or None.
+    """
     for player in players:
       if Rules.aligned_win(board, player) and player.aligned_five_prev:
         return player
@@ -177,8 +278,8 @@ class Rules(object):
 
       if Rules.aligned_win(board, player):
         if (player.aligned_five_prev or
-           not (Rules.can_reach_ten(board, opponent) or
-                Rules.can_break_five(board, opponent, player))):
+           not (Rules.can_reach_ten(board, opponent, threats) or
+                Rules.can_break_five(board, opponent, player, threats))):
           return player
         player.aligned_five_prev = True
       else:
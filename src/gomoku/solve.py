@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+import numpy as np
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.player import Player
+from gomoku.proof_number import PN_NODES, ProofNumberSearch
+from gomoku.solved import WIN, SolvedPositions
+from gomoku.symmetry import transform
+from gomoku.utils import human_move
+
+RESULTS = {True: "win", False: "no win", None: "unknown"}
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(
+      description="Proves or disproves a win of the side to move.")
+
+  parser.add_argument('boards', nargs='+', type=str,
+                      help='Text files which represent board states.')
+  parser.add_argument('-c', '--color', type=int, default=None,
+                      choices=[1, 2], help="Color to move (by default the "
+                      "one with fewer stones, black on equality).")
+  parser.add_argument('-n', '--nodes', type=int, default=PN_NODES,
+                      help="Maximum number of moves played.")
+  parser.add_argument('-t', '--time', type=float, default=np.inf,
+                      help="Maximum time (in seconds) per board.")
+  parser.add_argument('-o', '--solved', type=str, default=None,
+                      help="Binary file of solved positions the wins are "
+                      "added to.")
+
+  args = parser.parse_args()
+
+  solved = SolvedPositions(args.solved) if args.solved else None
+
+  for filename in args.boards:
+    board = Board(filename=filename)
+    color = args.color
+    if color is None:
+      color = 1 if (board.board == 1).sum() <= (board.board == 2).sum() else 2
+    game = GameHandler(board=board, players=[Player(1), Player(2)])
+    game.current = color - 1
+    game.hash = game.zobrist.hash(board, game.current,
+                                  game.get_player_captures())
+    search = ProofNumberSearch(game, color, max_nodes=args.nodes)
+    start = time.time()
+    result, move = search.solve(start + args.time)
+    if result and solved is not None:
+      key, sym = game.canonical_hash()
+      solved.add(key, WIN, transform(*move, sym, game.size))
+    move = "-" if move is None else "{} {}".format(*human_move(move))
+    print(f"{filename}: P{color} {RESULTS[result]} (move {move}, "
+          f"{search.nodes_searched} nodes, {time.time() - start:.2f}s)")
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+
+SOLVED_FILE = "solved.bin"
+MAGIC = b'GMKS'
+VERSION = 1
+HEADER = np.dtype([('magic', 'S4'), ('version', '<u4'), ('sorted', '<u8')])
+RECORD = np.dtype([('key', '<u8'), ('result', 'i1'), ('x', 'u1'),
+                   ('y', 'u1')])
+# results, for the side to move
+WIN, LOSS = 1, -1
+NO_MOVE = 255
+
+
+class SolvedPositions(object):
+  """Class SolvedPositions. Positions proven won or lost for the side to move
+  and their best move, kept in a binary file so that no game has to prove
+  them again.
+
+  The file is a header followed by fixed-size records (key, result, x, y).
+  The agents key positions by canonical hash (cf. GameHandler.canonical_hash)
+  and give the move in the canonical orientation, so a position is found
+  whichever of its 8 symmetric images is on the board.
+  The first `sorted` records are sorted by key: they are memory-mapped and
+  binary searched, so looking a position up only reads a few pages. Records
+  are appended at the end of the file (by any process, e.g. a background
+  analysis), read into a dict when the file grew, until compact merges them
+  into the sorted ones (which must not run while another process appends).
+
+  Parameters
+  ----------
+  filename: str (Default: SOLVED_FILE)
+    The file of the store, created if it does not exist.
+
+  Attributes
+  ----------
+  sorted: numpy.memmap
+    The records sorted by key.
+  recent: dict
+    recent[key] is the last record of key appended after the sorted ones.
+  size: int
+    Number of bytes of the file read so far.
+  """
+  def __init__(self, filename=SOLVED_FILE):
+    self.filename = filename
+    if not os.path.exists(filename):
+      self.write(np.zeros(0, dtype=RECORD))
+    self.load()
+
+  def write(self, records):
+    """Replaces the file by the `records`, sorted by key."""
+    header = np.array([(MAGIC, VERSION, len(records))], dtype=HEADER)
+    path = self.filename + '.tmp'
+    with open(path, 'wb') as f:
+      f.write(header.tobytes())
+      f.write(records.tobytes())
+    os.replace(path, self.filename)
+
+  def load(self):
+    """Maps the sorted records and reads the appended ones."""
+    header = np.fromfile(self.filename, dtype=HEADER, count=1)
+    if len(header) == 0 or header[0]['magic'] != MAGIC:
+      raise ValueError(f"{self.filename} is not a solved positions file")
+    count = int(header[0]['sorted'])
+    if count:
+      self.sorted = np.memmap(self.filename, dtype=RECORD, mode='r',
+                              offset=HEADER.itemsize, shape=(count,))
+    else:
+      self.sorted = np.zeros(0, dtype=RECORD)
+    self.size = HEADER.itemsize + count * RECORD.itemsize
+    self.recent = {}
+    self.refresh()
+
+  def refresh(self):
+    """Reads the records appended since the file was last read."""
+    size = os.path.getsize(self.filename)
+    if size < self.size:
+      # the file was compacted
+      self.load()
+      return
+    count = (size - self.size) // RECORD.itemsize
+    if count == 0:
+      return
+    with open(self.filename, 'rb') as f:
+      f.seek(self.size)
+      records = np.frombuffer(f.read(count * RECORD.itemsize), dtype=RECORD)
+    for record in records:
+      self.recent[int(record['key'])] = record
+    self.size += count * RECORD.itemsize
+
+  def __len__(self):
+    return len(self.sorted) + len(self.recent)
+
+  def lookup(self, key):
+    """Result (WIN or LOSS) and best move (None if unknown) of the position of
+    hash `key`, None if it is not in the store."""
+    self.refresh()
+    record = self.recent.get(key)
+    if record is None and len(self.sorted):
+      keys = self.sorted['key']
+      idx = np.searchsorted(keys, np.uint64(key))
+      if idx < len(keys) and keys[idx] == key:
+        record = self.sorted[idx]
+    if record is None:
+      return None
+    move = None
+    if record['x'] != NO_MOVE:
+      move = int(record['x']), int(record['y'])
+    return int(record['result']), move
+
+  def add(self, key, result, move=None):
+    """Appends the result (WIN or LOSS) and best move of the position of hash
+    `key`."""
+    x, y = (NO_MOVE, NO_MOVE) if move is None else move
+    record = np.array([(key, result, x, y)], dtype=RECORD)
+    with open(self.filename, 'ab') as f:
+      f.write(record.tobytes())
+    self.refresh()
+
+  def compact(self):
+    """Merges the appended records into the sorted ones (the last record of a
+    key wins)."""
+    self.refresh()
+    records = np.concatenate([np.array(self.sorted),
+                              np.array(list(self.recent.values()),
+                                       dtype=RECORD)])
+    # stable sort, keeping the last record of every key
+    records = records[::-1][np.argsort(records[::-1]['key'], kind='stable')]
+    records = records[np.unique(records['key'], return_index=True)[1]]
+    self.sorted = np.zeros(0, dtype=RECORD)
+    self.write(records)
+    self.load()
@@ -0,0 +1,113 @@
+import numpy as np
+
+# symmetries of the board (the dihedral group of the square): bit 4 swaps the
+# coordinates, then bit 1 mirrors x and bit 2 mirrors y
+SYMMETRIES = range(8)
+
+
+def transform(x, y, sym, size=19, inverse=False):
+  """Image of intersection (x, y) (ints or arrays) by the symmetry sym of the
+  board (or by its inverse if `inverse`)."""
+  if sym & 4 and not inverse:
+    x, y = y, x
+  if sym & 1:
+    x = size - 1 - x
+  if sym & 2:
+    y = size - 1 - y
+  if sym & 4 and inverse:
+    x, y = y, x
+  return x, y
+
+
+def stone_hashes(board, zobrist):
+  """Xor of the Zobrist keys of the stones of the board, for each of its
+  images by the symmetries."""
+  grid = np.asarray(board.board)
+  xs, ys = np.nonzero(grid)
+  colors = grid[xs, ys].astype(int)
+  hashes = []
+  for sym in SYMMETRIES:
+    tx, ty = transform(xs, ys, sym, board.size)
+    hashes.append(int(np.bitwise_xor.reduce(zobrist.table[colors, tx, ty],
+                                            initial=np.uint64(0))))
+  return hashes
+
+
+def canonical_hash(board, zobrist, key):
+  """Canonical hash of the position of Zobrist hash `key`: the least hash of
+  its images by the symmetries.
+
+  Return
+  ------
+  key: int
+    The canonical hash.
+  sym: int
+    The symmetry mapping the position to its canonical image.
+  """
+  hashes = stone_hashes(board, zobrist)
+  # the keys of the side to move and of the captures are left unchanged
+  rest = key ^ hashes[0]
+  sym = min(SYMMETRIES, key=lambda sym: hashes[sym] ^ rest)
+  return hashes[sym] ^ rest, sym
+
+
+class SymmetricHashes(object):
+  """Class SymmetricHashes. Hashes of the stones of the board in each of its
+  images by the symmetries, updated incrementally (a tracker of the game
+  handler), so that the canonical hash of a position (cf. canonical_hash)
+  costs 8 xors instead of hashing the board 8 times.
+
+  Parameters
+  ----------
+  board: Board
+    The board.
+  zobrist: Zobrist
+    The keys of the stones.
+
+  Attributes
+  ----------
+  keys: list
+    keys[color][x][y][sym] is the key of a stone of color at the image of
+    (x, y) by sym.
+  colors: int 2D list
+    colors[x][y] is the color of the stone at (x, y) (0 if empty).
+  hashes: int list
+    hashes[sym] is the xor of the keys of the stones in the image of the
+    board by sym.
+  """
+  def __init__(self, board, zobrist):
+    self.board = board
+    self.zobrist = zobrist
+    size = board.size
+    self.keys = [[[tuple(zobrist.stone(*transform(x, y, sym, size), color)
+                         for sym in SYMMETRIES)
+                   for y in range(size)] for x in range(size)]
+                 for color in range(3)]
+    self.reset()
+
+  def reset(self):
+    """Recompute the hashes from scratch."""
+    size = self.board.size
+    self.colors = [[int(self.board.get(x, y)) for y in range(size)]
+                   for x in range(size)]
+    self.hashes = stone_hashes(self.board, self.zobrist)
+
+  def update(self, x, y):
+    """Update the hashes after (x, y) changed."""
+    color = int(self.board.get(x, y))
+    previous = self.colors[x][y]
+    if color == previous:
+      return
+    self.colors[x][y] = color
+    for stone in [previous, color]:
+      if stone:
+        self.hashes = [h ^ key for h, key in
+                       zip(self.hashes, self.keys[stone][x][y])]
+
+  def canonical(self, key):
+    """Canonical hash of the position of Zobrist hash `key` and the symmetry
+    mapping the position to its canonical image (cf. canonical_hash)."""
+    hashes = self.hashes
+    rest = key ^ hashes[0]
+    sym = min(SYMMETRIES, key=lambda sym: hashes[sym] ^ rest)
+    return hashes[sym] ^ rest, sym
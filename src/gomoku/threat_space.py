@@ -0,0 +1,241 @@
+import time
+
+import numpy as np
+
+from gomoku.rules import DIRECTIONS, Rules
+from gomoku.utils import opposite
+
+# maximum number of attacking moves of a proof
+THREAT_DEPTH = 8
+
+
+def capture_setups(board, moves, color):
+  """Moves among `moves` after which color would threaten to capture a pair
+  ('X O O .' once color plays X)."""
+  size, setups = board.size, []
+  for x, y in moves:
+    for dx, dy in DIRECTIONS:
+      end = x + 3 * dx, y + 3 * dy
+      if (0 <= end[0] < size and 0 <= end[1] < size and
+          board.is_empty(*end) and
+          board.is_stone(x + dx, y + dy, opposite(color)) and
+              board.is_stone(x + 2 * dx, y + 2 * dy, opposite(color))):
+        setups.append((x, y))
+        break
+  return setups
+
+
+class ThreatSpaceSearch(object):
+  """Class ThreatSpaceSearch. Looks for a forced win of color by continuous
+  threats: every attacking move makes a four (and, if `threes`, a free three),
+  and only the answers that could parry it are searched for the defender.
+
+  Captures can break a four or a five (cf. Rules.check_winner), so the
+  defender is always allowed to capture, a five only wins if the defender can
+  neither break it nor reach ten captures, and reaching ten captures wins. A
+  four is answered by a block, a capture or a five of the defender. A free
+  three is also answered by any move where the attacker would make a four,
+  a four of the defender, or a move threatening to capture. A five of the
+  defender that can be broken only leaves the attacker the captures breaking
+  it (cf. breaks).
+
+  Parameters
+  ----------
+  gh: GameHandler
+    The game handler of the position, color being to move.
+  color: int
+    The color of the attacker.
+  threes: bool (Default: False)
+    If True, free threes are threats too (victory by continuous fours and
+    threes), else only fours are (victory by continuous fours).
+  max_depth: int (Default: THREAT_DEPTH)
+    Maximum number of attacking moves.
+
+  Attributes
+  ----------
+  refuted: dict
+    refuted[hash] is the largest number of attacking moves the position of
+    hash was searched with without finding a win.
+  nodes_searched: int
+    Number of moves played by the last solve.
+  deadline: float
+    Time after which the search is aborted.
+  aborted: bool
+    True once the search passed the deadline.
+  """
+  def __init__(self, gh, color, threes=False, max_depth=THREAT_DEPTH):
+    self.gh = gh
+    self.color = color
+    self.threes = threes
+    self.max_depth = max_depth
+    self.refuted = {}
+    self.nodes_searched = 0
+    self.deadline = np.inf
+    self.aborted = False
+
+  def solve(self, deadline=np.inf):
+    """Winning move of the attacker (to move), searching shortest wins first
+    (iterative deepening), until the deadline.
+
+    Return
+    ------
+    move: (int, int)
+      The first move of a forced win, None if none was found.
+    """
+    self.deadline, self.aborted = deadline, False
+    self.nodes_searched = 0
+    for depth in range(1, self.max_depth + 1):
+      move = self.attack(depth)
+      if move is not None or self.aborted:
+        return move
+    return None
+
+  def out_of_time(self):
+    """Return True (from then on) once the search passed the deadline."""
+    if not self.aborted and time.time() >= self.deadline:
+      self.aborted = True
+    return self.aborted
+
+  def wins(self, color):
+    """Return True if color, who just moved, won: ten captures, or five
+    aligned that the other color can neither break nor answer by reaching ten
+    captures."""
+    gh = self.gh
+    player, opponent = gh.players[color - 1], gh.players[2 - color]
+    if player.captures >= 10:
+      return True
+    return (Rules.aligned_win(gh.board, player) and
+            not (Rules.can_reach_ten(gh.board, opponent, gh.threats) or
+                 Rules.can_break_five(gh.board, opponent, player,
+                                      gh.threats)))
+
+  def fives(self, color):
+    """Intersections where color would align five."""
+    alignment = self.gh.priorities.alignment
+    return [move for move in self.gh.child_list
+            if alignment(*move, color) == 4]
+
+  def play(self, move):
+    """Plays move, returning True if the player who played it won."""
+    color = self.gh.players[self.gh.current].color
+    self.gh.do_move(move)
+    self.nodes_searched += 1
+    return self.wins(color)
+
+  def breaks(self):
+    """Moves of the attacker (to move) capturing stones of the five the
+    defender just aligned, best first, None if it aligned none. Any other move
+    loses (cf. Rules.check_winner)."""
+    gh, color = self.gh, self.color
+    defender = gh.players[2 - color]
+    if not Rules.aligned_win(gh.board, defender):
+      return None
+    aligned = set(Rules.aligned_coords(gh.board, defender))
+    forbidden = gh.forbidden.forbidden[color]
+    moves = [move for move in gh.threats.capturing[color]
+             if move not in forbidden and
+             aligned & set(gh.threats.captures(*move, color))]
+    return gh.priorities.sort(moves, color)
+
+  def attacks(self):
+    """Moves of the attacker winning at once if any, else making a four (or a
+    free three, if threes) by decreasing priority. If the defender threatens
+    to align five, only the attacking moves blocking it are."""
+    gh, color = self.gh, self.color
+    forbidden = gh.forbidden.forbidden[color]
+    alignment = gh.priorities.alignment
+    moves = [move for move in gh.child_list if move not in forbidden]
+    wins, fours = [], []
+    if gh.players[color - 1].captures >= 8:
+      wins = [move for move in gh.threats.capturing[color]
+              if move not in forbidden]
+    for move in moves:
+      level = alignment(*move, color)
+      if level == 4 and move not in wins:
+        wins.append(move)
+      elif level == 3:
+        fours.append(move)
+    if wins:
+      return wins
+    if self.threes:
+      threes = gh.forbidden.threes[color]
+      fours += [(x, y) for x, y in moves
+                if threes[x][y] > 0 and (x, y) not in fours]
+    blocks = self.fives(opposite(color))
+    if blocks:
+      fours = [move for move in fours if move in blocks]
+    return gh.priorities.sort(fours, color)
+
+  def defenses(self, three):
+    """Answers of the defender (to move) to the last attacking move: fives,
+    blocks of the fives of the attacker and captures if it made a four, plus
+    any move where either color would make a four and capture threats if it
+    made a free three (`three`), None if it made no threat."""
+    gh, color = self.gh, opposite(self.color)
+    forbidden = gh.forbidden.forbidden[color]
+    moves = [move for move in gh.child_list if move not in forbidden]
+    defenses = [move for move in self.fives(color) if move not in forbidden]
+    defenses += [move for move in gh.threats.capturing[color]
+                 if move not in forbidden and move not in defenses]
+    blocks = self.fives(self.color)
+    if blocks:
+      return defenses + [move for move in blocks
+                         if move not in forbidden and move not in defenses]
+    if not three:
+      return None
+    alignment = gh.priorities.alignment
+    answers = [move for move in moves
+               if alignment(*move, self.color) >= 3 or
+               alignment(*move, color) >= 3]
+    answers += capture_setups(gh.board, moves, color)
+    return defenses + [move for move in dict.fromkeys(answers)
+                       if move not in defenses]
+
+  def attack(self, depth):
+    """Winning move of the attacker (to move) with at most `depth` attacking
+    moves (None if none was found)."""
+    if self.out_of_time() or self.refuted.get(self.gh.hash, 0) >= depth:
+      return None
+    gh, color = self.gh, self.color
+    alignment, threes = gh.priorities.alignment, gh.forbidden.threes[color]
+    defender = gh.players[2 - color]
+    moves = self.breaks()
+    breaking = moves is not None
+    if not breaking:
+      moves = self.attacks()
+    for move in moves:
+      level = alignment(*move, color)
+      three = level < 3
+      threat = level >= 3 or self.threes and threes[move[0]][move[1]] > 0
+      if self.play(move):
+        self.gh.undo_move()
+        return move
+      if breaking:
+        if Rules.aligned_win(gh.board, defender):
+          # the five of the defender is still there: it won
+          self.gh.undo_move()
+          continue
+        # breaking the five is a threat if a five of the attacker is left
+        threat = threat or bool(self.fives(color))
+      proven = depth > 1 and threat and self.defend(depth - 1, three)
+      self.gh.undo_move()
+      if proven:
+        return move
+      if self.aborted:
+        return None
+    self.refuted[self.gh.hash] = depth
+    return None
+
+  def defend(self, depth, three):
+    """Return True if every answer of the defender (to move) to the last
+    attacking move (a free three if `three`, else a four) loses to an attack
+    of at most `depth` moves."""
+    defenses = self.defenses(three)
+    if defenses is None:
+      return False
+    for move in defenses:
+      escaped = self.play(move) or self.attack(depth) is None
+      self.gh.undo_move()
+      if escaped:
+        return False
+    return True
@@ -0,0 +1,127 @@
+import numpy as np
+
+TT_BITS = 16
+
+
+class Entry(object):
+  """Class Entry. What the search learnt about a position.
+
+  Attributes
+  ----------
+  key: int
+    Hash of the position.
+  lowerbound: float
+    Lower bound of the value of the position.
+  upperbound: float
+    Upper bound of the value of the position.
+  depth: int
+    Depth the position was searched at.
+  move: (int, int)
+    Best move found from the position (None if unknown).
+  age: int
+    Generation (search) the entry was last written in.
+  """
+  __slots__ = ('key', 'lowerbound', 'upperbound', 'depth', 'move', 'age')
+
+  def __init__(self, key, depth, age):
+    self.key, self.depth, self.age = key, depth, age
+    self.lowerbound, self.upperbound, self.move = -np.inf, np.inf, None
+
+
+class TranspositionTable(object):
+  """Class TranspositionTable. Fixed-capacity table of the positions seen by
+  the searches, indexed by the low bits of their hash.
+
+  Every bucket holds two entries: a depth-preferred one, only replaced by a
+  search at least as deep or by a later generation, and an always-replace one,
+  which takes the entries the first one refuses (or evicts). The generation is
+  increased at every new search, so that entries of positions that can no
+  longer happen stop holding on to their slot.
+
+  Parameters
+  ----------
+  bits: int (Default: TT_BITS)
+    The table has 2 ** bits buckets.
+
+  Attributes
+  ----------
+  deep: list
+    deep[i] is the depth-preferred entry of bucket i (None if empty).
+  recent: list
+    recent[i] is the always-replace entry of bucket i (None if empty).
+  age: int
+    Current generation.
+  """
+  def __init__(self, bits=TT_BITS):
+    self.mask = (1 << bits) - 1
+    self.age = 0
+    self.clear()
+
+  def clear(self):
+    """Forget every entry."""
+    self.deep = [None] * (self.mask + 1)
+    self.recent = [None] * (self.mask + 1)
+
+  def new_search(self):
+    """Start a new generation."""
+    self.age += 1
+
+  def __len__(self):
+    return (sum(entry is not None for entry in self.deep) +
+            sum(entry is not None for entry in self.recent))
+
+  def probe(self, key):
+    """Entry of the position of hash `key` (None if not in the table)."""
+    idx = key & self.mask
+    entry = self.deep[idx]
+    if entry is not None and entry.key == key:
+      return entry
+    entry = self.recent[idx]
+    if entry is not None and entry.key == key:
+      return entry
+    return None
+
+  def store(self, key, depth, val, alpha, beta, move=None):
+    """Stores the value `val` of the position of hash `key` searched at
+    `depth` within the window (alpha, beta), and its best move. A deeper entry
+    of the same position is kept as it is, one of the same depth only gets the
+    new bound(s) (cf. https://people.csail.mit.edu/plaat/mtdf.html#abmem),
+    so that lowerbound <= upperbound always holds.
+
+    Return
+    ------
+    entry: Entry
+      The entry of the position.
+    """
+    entry = self.probe(key)
+    if entry is not None and entry.depth > depth:
+      entry.age = self.age
+      return entry
+    if entry is None:
+      entry = Entry(key, depth, self.age)
+    elif entry.depth < depth:
+      entry.depth = depth
+      entry.lowerbound, entry.upperbound = -np.inf, np.inf
+    idx = key & self.mask
+    deep = self.deep[idx]
+    if entry is not deep:
+      if deep is None or deep.age != self.age or depth >= deep.depth:
+        self.deep[idx] = entry
+        if deep is not None or self.recent[idx] is entry:
+          self.recent[idx] = deep
+      else:
+        self.recent[idx] = entry
+    entry.age = self.age
+    # a bound conflicting with the other one (searches of the same depth
+    # disagreeing, e.g. because of the move order) replaces it
+    if val > alpha:
+      entry.lowerbound = val
+      if entry.upperbound < val:
+        entry.upperbound = np.inf
+    if val < beta:
+      entry.upperbound = val
+      if entry.lowerbound > val:
+        entry.lowerbound = -np.inf
+    if move is not None:
+      entry.move = move
+    return entry
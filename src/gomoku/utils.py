@@ -55,35 +55,6 @@ def count_stones(position, color):
   return dict(zip(unique, counts))[color]
 
 
-def indefensible_four(board, coords, color):
-  indefensibles = 0
-  for i in range(1, 6):
-    v, w = coords[i]
-    if not board.is_empty(v, w):
-      continue
-    board.place(v, w, color)
-    same = 0
-    empty = 0
-    for x, y in coords:
-      if board.is_empty(x, y):
-        if same == 0:
-          empty = 1
-          continue
-        elif same == 4:
-          empty += 1
-        break
-      elif board.is_stone(x, y, color):
-        same += 1
-      elif not board.is_stone(x, y, color) and same == 0:
-        continue
-      else:
-        break
-    if same >= 4 and empty >= 2:
-      indefensibles += 1
-    board.remove(v, w)
-  return indefensibles
-
-
 def get_player(gameHandler, color, maximizingPlayer):
   players = gameHandler.players
   player = players[0] if players[0].color == color else players[1]
@@ -142,21 +113,6 @@ def nearby_stones(move, board):
   return nearby
 
 
-def update_child_after_move(game_handler, captures, last_move):
-  game_handler.child_list = list(set(game_handler.child_list +
-                                 nearby_stones(last_move, game_handler.board)))
-  if (last_move[0], last_move[1]) in game_handler.child_list:
-    game_handler.child_list.remove((last_move[0], last_move[1]))
-  for capture in captures:
-    for stone in nearby_stones(capture, game_handler.board):
-      if (not is_there_stones_around(game_handler.board.board, *stone) and
-          stone in game_handler.child_list):
-        game_handler.child_list.remove(stone)
-  for capture in captures:
-    if capture not in game_handler.child_list:
-      game_handler.child_list.append(capture)
-
-
 def get_player_name(player):
   from gomoku.mcts import MCTSAgent
   from gomoku.minimax import MiniMaxAgent
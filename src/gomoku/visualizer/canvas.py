@@ -1,5 +1,6 @@
 import tkinter as tk
 
+import numpy as np
 from PIL import Image, ImageEnhance, ImageTk
 
 from gomoku.visualizer.utils import (BOARD_OFFSET, BOARD_SIZE, COLOR,
@@ -49,15 +50,11 @@ class Canvas(object):
     self.color = gameHandler.current
     self.canvas.delete("all")
     self.canvas.create_image(*BOARD_OFFSET, anchor='nw', image=self.tkBoard)
-    board = gameHandler.board
-    size = gameHandler.board.size
-    for i in range(size):
-      for j in range(size):
-        stone = board.board[i][j]
-        if stone != 0:
-          stone = self.tkWhite if stone == 2 else self.tkBlack
-          offset = coords_to_pixel([j, i])
-          self.canvas.create_image(*offset, anchor="nw", image=stone)
+    position = gameHandler.board.board
+    for i, j in zip(*np.nonzero(position)):
+      stone = self.tkWhite if position[i][j] == 2 else self.tkBlack
+      offset = coords_to_pixel([j, i])
+      self.canvas.create_image(*offset, anchor="nw", image=stone)
 
     if len(gameHandler.move_history) > 0:
       last_move = gameHandler.move_history[-1]
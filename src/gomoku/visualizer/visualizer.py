@@ -165,7 +165,7 @@ class Visualizer(object):
         self.gameHandler.undo_move()
         self.gameHandler.turn -= 1
     for player in self.gameHandler.players:
-      if hasattr(player, 'undo_scores'):
-        player.color_scores = player.undo_scores
+      if isinstance(player, Agent):
+        player.undo()
     self.playerInput = False
     self.canvas.load_board(self.gameHandler)
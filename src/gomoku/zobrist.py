@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+
+SEED = 0x5EED
+MAX_CAPTURES_KEYS = 32
+
+
+class Zobrist(object):
+  """Class Zobrist. Random keys used to hash a position into a single int.
+
+  The hash of a position is the xor of the keys of its stones, of the key of
+  the side to move (if the second player is to move) and of the keys of the
+  number of stones captured by each player. Keys are drawn from a fixed seed,
+  so the same position always gets the same hash.
+
+  Parameters
+  ----------
+  size: int (Default: 19)
+    Size of the board.
+  seed: int (Default: SEED)
+    Seed of the random generator.
+
+  Attributes
+  ----------
+  stones: int 3D list
+    stones[color][x][y] is the key of a stone of color at (x, y).
+  table: numpy.ndarray
+    The stone keys as an array of uint64 (to hash many stones at once).
+  side: int
+    Key xored every time the side to move changes.
+  captures: int 2D list
+    captures[i][n] is the key of player i having captured n stones.
+  """
+  def __init__(self, size=19, seed=SEED):
+    rng = random.Random(seed)
+    self.size = size
+    self.stones = [[[rng.getrandbits(64) for _ in range(size)]
+                    for _ in range(size)] for _ in range(3)]
+    self.table = np.array(self.stones, dtype=np.uint64)
+    self.side = rng.getrandbits(64)
+    self.captures = [[rng.getrandbits(64) for _ in range(MAX_CAPTURES_KEYS)]
+                     for _ in range(2)]
+
+  def stone(self, x, y, color):
+    """Key of a stone of color `color` at intersection (x, y)."""
+    return self.stones[color][x][y]
+
+  def capture(self, idx, nb_captures):
+    """Key of player `idx` having captured `nb_captures` stones."""
+    return self.captures[idx][min(nb_captures, MAX_CAPTURES_KEYS - 1)]
+
+  def hash(self, board, current=0, captures=(0, 0)):
+    """Computes the hash of a position from scratch.
+
+    Parameters
+    ----------
+    board: Board
+      The board.
+    current: int
+      Index of the player to move.
+    captures: (int, int)
+      Number of stones captured by each player.
+
+    Return
+    ------
+    h: int
+      The hash of the position.
+    """
+    h = self.side if current else 0
+    for x in range(self.size):
+      for y in range(self.size):
+        if not board.is_empty(x, y):
+          h ^= self.stones[int(board.get(x, y))][x][y]
+    for idx, nb_captures in enumerate(captures):
+      h ^= self.capture(idx, nb_captures)
+    return h
@@ -0,0 +1,54 @@
+import glob
+
+import numpy as np
+import pytest
+
+from gomoku.bitboard import BitBoard
+from gomoku.board import Board
+from gomoku.heuristics import heuristic
+from gomoku.player import Player
+from gomoku.rules import Rules
+
+FILES = sorted(glob.glob("boards/evals/*.txt"))
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_same_view(filename):
+  board, bitboard = Board(filename), BitBoard(filename)
+  assert np.array_equal(board.board, bitboard.board)
+  assert board.empty_board() == bitboard.empty_board()
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_aligned_win(filename):
+  board, bitboard = Board(filename), BitBoard(filename)
+  for color in [1, 2]:
+    player = Player(color)
+    for x in range(board.size):
+      for y in range(board.size):
+        if not board.is_stone(x, y, color):
+          continue
+        player.last_move = (x, y)
+        assert (Rules.aligned_win(board, player) ==
+                Rules.aligned_win(bitboard, player))
+
+
+def test_place_remove():
+  bitboard = BitBoard()
+  bitboard.place(18, 18, 2).place(0, 18, 1)
+  assert bitboard.get(18, 18) == 2 and bitboard.is_stone(0, 18, 1)
+  assert bitboard.board[18][18] == 2
+  bitboard.place(18, 18, 1)
+  assert bitboard.get(18, 18) == 1
+  bitboard.remove(18, 18).remove(0, 18)
+  assert bitboard.empty_board()
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_compact(filename):
+  board, compact = Board(filename), Board(filename, compact=True)
+  assert compact.board.dtype == np.int8
+  assert np.array_equal(board.board, compact.board)
+  for color in [1, 2]:
+    assert (heuristic(board.board, color, True)[0] ==
+            heuristic(compact.board, color, True)[0])
@@ -1,5 +1,6 @@
 import os.path as osp
 
+import numpy as np
 import pytest
 
 from gomoku.board import Board
@@ -41,3 +42,27 @@ def test_double_threes(problem):
   move = [move[0] - 1, move[1] - 1]
   game_handler.do_move(move)
   assert Rules.no_double_threes(game_handler.board, player) == label
+
+
+@pytest.mark.parametrize("board_name", FILES)
+def test_forbidden_mask(board_name):
+  board = Board(eval_path(board_name))
+  for color in [1, 2]:
+    mask = Rules.forbidden_mask(board, color)
+    player = Player(color)
+    for x in range(board.size):
+      for y in range(board.size):
+        if not board.is_empty(x, y):
+          assert not mask[x][y]
+          continue
+        player.last_move = (x, y)
+        assert mask[x][y] == (not Rules.no_double_threes(board, player))
+    assert np.array_equal(board.board, BOARDS[board_name])
+
+
+@pytest.mark.parametrize("problem", NO_DOUBLE_FREE_THREES.items())
+def test_can_place(problem):
+  board_name, (move, label) = problem
+  node = game_handler(board_name)
+  assert node.can_place(move[0] - 1, move[1] - 1) == label
+  assert np.array_equal(node.board.board, BOARDS[board_name])
@@ -0,0 +1,168 @@
+import os.path as osp
+
+import numpy as np
+import pytest
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.player import Player
+from gomoku.priorities import MovePriorities
+from gomoku.rules import Rules
+from gomoku.script import Script
+from gomoku.utils import is_there_stones_around
+
+SCRIPTS = ['capture', 'can_capture_five', 'two_free_threes']
+
+
+def moves_from_script(filename):
+  script = Script(osp.join('scripts', filename + '.txt'))
+  return [(x - 1, y - 1) for x, y in script.move]
+
+
+def full_hash(gh):
+  return gh.zobrist.hash(gh.board, gh.current, gh.get_player_captures())
+
+
+@pytest.mark.parametrize("filename", SCRIPTS)
+def test_incremental_hash(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  hashes = [gh.hash]
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    assert gh.hash == full_hash(gh)
+    hashes.append(gh.hash)
+  while gh.move_history:
+    gh.undo_move()
+    hashes.pop()
+    assert gh.hash == hashes[-1] == full_hash(gh)
+
+
+@pytest.mark.parametrize("filename", SCRIPTS)
+def test_retrieve_captured_stones(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  retrieved = [gh.retrieve_captured_stones()]
+  captures = []
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    if gh.capture_history[-1]:
+      captures.append(gh.capture_history[-1])
+    assert gh.retrieve_captured_stones() == sum(captures[-2:], [])
+    retrieved.append(gh.retrieve_captured_stones())
+  while gh.move_history:
+    gh.undo_move()
+    retrieved.pop()
+    assert gh.retrieve_captured_stones() == retrieved[-1]
+
+
+def test_basic_move_hash():
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  start = gh.hash
+  gh.basic_move((9, 9))
+  gh.basic_move((9, 10))
+  assert gh.hash != start
+  gh.basic_undo()
+  gh.basic_undo()
+  assert gh.hash == start
+
+
+@pytest.mark.parametrize("filename", SCRIPTS)
+def test_forbidden_moves(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    for color in [1, 2]:
+      mask = Rules.forbidden_mask(gh.board, color)
+      assert gh.forbidden.forbidden[color] == set(zip(*np.nonzero(mask)))
+  while gh.move_history:
+    gh.undo_move()
+    for color in [1, 2]:
+      mask = Rules.forbidden_mask(gh.board, color)
+      assert gh.forbidden.forbidden[color] == set(zip(*np.nonzero(mask)))
+
+
+@pytest.mark.parametrize("filename", SCRIPTS)
+def test_capture_threats(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    for color in [1, 2]:
+      assert (set(gh.threats.capturing[color]) ==
+              set(Rules.capturing_moves(gh.board, color)))
+      for x, y in gh.threats.capturing[color]:
+        assert (sorted(gh.threats.captures(x, y, color)) ==
+                sorted(Rules.captures_at(gh.board, x, y, color)))
+  while gh.move_history:
+    gh.undo_move()
+    for color in [1, 2]:
+      assert (set(gh.threats.capturing[color]) ==
+              set(Rules.capturing_moves(gh.board, color)))
+
+
+@pytest.mark.parametrize("filename", ['can_capture_five', 'can_win_by_capture'])
+def test_check_winner_threats(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    previous = [player.aligned_five_prev for player in gh.players]
+    winner = Rules.check_winner(gh.board, gh.players)
+    scanned = [player.aligned_five_prev for player in gh.players]
+    for player, prev in zip(gh.players, previous):
+      player.aligned_five_prev = prev
+    assert Rules.check_winner(gh.board, gh.players, gh.threats) is winner
+    assert [player.aligned_five_prev for player in gh.players] == scanned
+
+
+def frontier_scan(gh):
+  size = gh.board.size
+  return {(x, y) for x in range(size) for y in range(size)
+          if gh.board.is_empty(x, y) and
+          is_there_stones_around(gh.board.board, x, y)}
+
+
+@pytest.mark.parametrize("filename", SCRIPTS)
+def test_frontier(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  orders = [gh.child_list]
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    assert set(gh.child_list) == frontier_scan(gh)
+    assert len(gh.child_list) == len(set(gh.child_list))
+    orders.append(gh.child_list)
+  # undoing a capture may reorder the intersections it had emptied
+  exact = True
+  while gh.move_history:
+    exact = exact and not gh.capture_history[-1]
+    gh.undo_move()
+    orders.pop()
+    assert set(gh.child_list) == frontier_scan(gh)
+    if exact:
+      assert gh.child_list == orders[-1]
+
+
+@pytest.mark.parametrize("filename", SCRIPTS)
+def test_move_priorities(filename):
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  for move in moves_from_script(filename):
+    if not gh.board.is_empty(*move):
+      break
+    gh.do_move(move)
+    assert gh.priorities.values == MovePriorities(gh.board).values
+  for color in [1, 2]:
+    priorities = [gh.priorities.priority(*move, color)
+                  for move in gh.priorities.sort(gh.child_list, color)]
+    assert priorities == sorted(priorities, reverse=True)
+  while gh.move_history:
+    gh.undo_move()
+    assert gh.priorities.values == MovePriorities(gh.board).values
@@ -0,0 +1,103 @@
+import glob
+import os.path as osp
+
+import numpy as np
+import pytest
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.heuristics import (apply_changes, batch_heuristic,
+                               capture_heuristic, heuristic, pattern_heuristic,
+                               vectorized_heuristic)
+from gomoku.player import Player
+from gomoku.script import Script
+
+FILES = sorted(glob.glob("boards/evals/*.txt") +
+               glob.glob("boards/expert/*.txt"))
+BOARDS = {filename: Board(filename) for filename in FILES}
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_pattern_heuristic(filename):
+  board = BOARDS[filename]
+  for color in [1, 2]:
+    for my_turn in [True, False]:
+      assert (pattern_heuristic(board.lines, color, my_turn) ==
+              heuristic(board.board, color, my_turn)[0])
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_evaluator(filename):
+  gh = GameHandler(Board(filename), [Player(1), Player(2)])
+  for color in [1, 2]:
+    for my_turn in [True, False]:
+      assert (gh.evaluator.heuristic(color, my_turn) ==
+              heuristic(gh.board.board, color, my_turn)[0])
+
+
+def test_evaluator_captures():
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  script = Script(osp.join('scripts', 'capture.txt'))
+  for x, y in script.move:
+    gh.do_move((x - 1, y - 1))
+    assert (gh.evaluator.heuristic(1, True) ==
+            heuristic(gh.board.board, 1, True)[0])
+  while gh.move_history:
+    gh.undo_move()
+    assert (gh.evaluator.heuristic(2, False) ==
+            heuristic(gh.board.board, 2, False)[0])
+
+
+def test_copy_on_write_scores():
+  gh = GameHandler(Board(), [Player(1), Player(2)])
+  scores = (np.zeros((19, 19)), np.zeros((19, 19)))
+  history = []
+  for x, y in Script(osp.join('scripts', 'capture.txt')).move:
+    gh.do_move((x - 1, y - 1))
+    stones = [gh.last_move()] + gh.retrieve_captured_stones()
+    expected = heuristic(gh.board.board, 1, True, stones,
+                         tuple(np.copy(past) for past in scores))
+    before = tuple(np.copy(past) for past in scores)
+    score, changes = heuristic(gh.board.board, 1, True, stones, scores,
+                               copy_on_write=True)
+    assert score == expected[0]
+    assert all(np.array_equal(*maps) for maps in zip(before, scores))
+    history.append((before, apply_changes(scores, changes)))
+    assert all(np.array_equal(*maps) for maps in zip(expected[1], scores))
+  for before, reverse in reversed(history):
+    apply_changes(scores, reverse)
+    assert all(np.array_equal(*maps) for maps in zip(before, scores))
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_vectorized_heuristic(filename):
+  position = BOARDS[filename].board
+  for color in [1, 2]:
+    for my_turn in [True, False]:
+      blank = (np.zeros(position.shape), np.zeros(position.shape))
+      score, past_scores = heuristic(position, color, my_turn, [], blank)
+      vect_score, vect_past_scores = vectorized_heuristic(position, color,
+                                                          my_turn)
+      assert vect_score == score
+      assert np.array_equal(vect_past_scores[0], past_scores[0])
+      assert np.array_equal(vect_past_scores[1], past_scores[1])
+
+
+def test_batch_heuristic():
+  positions = np.array([BOARDS[filename].board for filename in FILES])
+  nb_positions = len(positions)
+  color = np.arange(nb_positions) % 2 + 1
+  to_move = (np.arange(nb_positions) // 2) % 2 + 1
+  captures = np.array([[2 * (i % 3), 2 * (i % 5)] for i in range(nb_positions)])
+  # ten captures or more win, for either side
+  captures[:4] = [[10, 2], [12, 4], [0, 12], [2, 10]]
+  scores = batch_heuristic(positions, color, to_move, captures, chunk_size=7)
+  for i in range(nb_positions):
+    player, opponent = Player(color[i]), Player(3 - color[i])
+    player.captures = captures[i][color[i] - 1]
+    opponent.captures = captures[i][2 - color[i]]
+    expected = (heuristic(positions[i], color[i], to_move[i] == color[i])[0] +
+                capture_heuristic(player, opponent, True))
+    assert scores[i] == expected
+  # colors 1, 2, 1, 2: wins of the color, then of its opponent
+  assert list(scores[:4]) == [np.inf, -np.inf, -np.inf, np.inf]
@@ -0,0 +1,164 @@
+import glob
+import time
+
+import numpy as np
+import pytest
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.heuristics import SCORE
+from gomoku.minimax import QUIESCENCE_DEPTH, SEARCH_TIME, MiniMaxAgent
+
+FILES = sorted(glob.glob("boards/evals/*.txt"))[:8]
+
+
+def search(filename, algorithm_name, depth):
+  """Values of the best root moves of black after iterative deepening up to
+  `depth` (from the same root moves for every algorithm)."""
+  players = [MiniMaxAgent(color, algorithm_name=algorithm_name)
+             for color in [1, 2]]
+  agent = players[0]
+  agent.gh = GameHandler(Board(filename), players)
+  agent.new_search()
+  moves = agent.children(agent.color, agent.max_top_moves)
+  for agent.root_depth in range(1, depth + 1):
+    values = [agent.minimaximizer(move, agent.root_depth) for move in moves]
+  return values, agent
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_pvs(filename):
+  values, agent = search(filename, 'pvs', 2)
+  assert values == search(filename, 'alpha_beta', 2)[0]
+  # principal variations are sequences of legal moves
+  gh = agent.gh
+  for move, line in agent.pv_lines.items():
+    assert len(line) <= 2
+    for played in [move] + line:
+      assert gh.board.is_empty(*played)
+      gh.do_move(played)
+    for _ in range(len(line) + 1):
+      gh.undo_move()
+
+
+@pytest.mark.parametrize("algorithm_name", ['alpha_beta', 'mtdf', 'pvs'])
+def test_time_limit(algorithm_name):
+  players = [MiniMaxAgent(color, depth=10, algorithm_name=algorithm_name)
+             for color in [1, 2]]
+  gh = GameHandler(Board("boards/expert/kcosta.txt"), players)
+  agent = players[0]
+  start = time.time()
+  move = agent.find_move(gh)
+  # depth 10 cannot be reached: iterative deepening stops (or is aborted)
+  # before it, by the deadline
+  assert agent.ite_deep_depth < agent.depth - 1
+  assert start <= agent.deadline - SEARCH_TIME * agent.time_limit <= start + 1
+  assert gh.can_place(*move)
+  # once past the deadline, searches are aborted
+  agent.deadline, agent.aborted = time.time() - 1, False
+  assert agent.out_of_time() and agent.aborted
+
+
+@pytest.mark.parametrize("algorithm_name",
+                         ['alpha_beta', 'alpha_beta_memory', 'pvs'])
+def test_pruning(algorithm_name):
+  players = [MiniMaxAgent(color, algorithm_name=algorithm_name)
+             for color in [1, 2]]
+  agent = players[0]
+  agent.null_move = agent.late_move_reductions = True
+  agent.gh = gh = GameHandler(Board(FILES[0]), players)
+  key, current = gh.hash, gh.current
+  agent.new_search()
+  moves = agent.children(agent.color, agent.max_top_moves)
+  for agent.root_depth in range(1, 4):
+    for move in moves:
+      agent.minimaximizer(move, agent.root_depth)
+  # passes and reduced searches leave the position as it was
+  assert (gh.hash, gh.current, gh.move_history) == (key, current, [])
+  # and find the same move as the full search on a tactical board
+  moves = []
+  for pruning in [False, True]:
+    board = Board("boards/evals/need_to_protect_four.txt")
+    to_move = 1 if (board.board == 1).sum() <= (board.board == 2).sum() else 2
+    players = [MiniMaxAgent(color, 4, algorithm_name=algorithm_name)
+               for color in [1, 2]]
+    agent = players[to_move - 1]
+    agent.null_move = agent.late_move_reductions = pruning
+    agent.time_limit = np.inf
+    agent.threat_space = agent.proof_number = False
+    gh = GameHandler(board, players)
+    gh.current = to_move - 1
+    gh.hash = gh.zobrist.hash(board, gh.current, gh.get_player_captures())
+    moves.append(agent.find_move(gh))
+    # principal variations are lines of legal moves
+    for move, line in agent.pv_lines.items():
+      for pv_move in [move] + line:
+        assert board.is_empty(*pv_move)
+        gh.do_move(pv_move)
+      for _ in range(len(line) + 1):
+        gh.undo_move()
+  assert moves[0] == moves[1] == (6, 6)
+
+
+def test_children():
+  players = [MiniMaxAgent(color) for color in [1, 2]]
+  agent = players[0]
+  agent.gh = GameHandler(Board("boards/evals/good_two.txt"), players)
+  agent.new_search()
+  agent.root_depth = 3
+  moves = agent.children(1, depth=3)
+  assert moves[:5] == [(10, 8), (7, 11), (8, 9), (8, 8), (7, 9)]
+  # history scores reorder moves of the same priority
+  agent.history[1][7, 9] = 1
+  assert agent.children(1, depth=3)[3:5] == [(7, 9), (8, 8)]
+  # the killer move comes right after the first move and the captures
+  agent.store_cutoff((7, 10), 1, 3)
+  assert agent.children(1, depth=3, first=(10, 11))[:6] == [
+      (10, 11), (10, 8), (7, 11), (7, 10), (8, 9), (7, 9)]
+  assert agent.children(1).index((7, 10)) > 3
+
+
+def test_quiescence():
+  players = [MiniMaxAgent(color) for color in [1, 2]]
+  agent = players[0]
+  agent.quiescence_depth = QUIESCENCE_DEPTH
+  agent.gh = gh = GameHandler(Board("boards/evals/protect_five_easy.txt"),
+                              players)
+  # white has to block the five of black
+  assert agent.forcing_moves(2) == ([(8, 7)], True)
+  # black to move aligns five instead of standing pat
+  player, opponent = agent.return_players(False)
+  assert (agent.quiescence(False, -np.inf, np.inf) == SCORE['XXXXX'] >
+          agent.evaluation(agent.color, True, player, opponent))
+  agent.quiescence_depth = 0
+  assert (agent.quiescence(False, -np.inf, np.inf) ==
+          agent.evaluation(agent.color, True, player, opponent))
+  assert gh.move_history == []
+
+
+@pytest.mark.parametrize("algorithm_name", ["alpha_beta_memory", "mtdf"])
+def test_symmetric_table(algorithm_name):
+  moves = {}
+  for symmetric in [False, True]:
+    players = [MiniMaxAgent(color, 3, algorithm_name=algorithm_name)
+               for color in [1, 2]]
+    agent = players[1]
+    agent.symmetric_table, agent.time_limit = symmetric, np.inf
+    agent.threat_space = agent.proof_number = False
+    gh = GameHandler(Board(), players)
+    gh.do_move((9, 9))
+    moves[symmetric] = agent.find_move(gh)
+    key, sym = agent.table_key()
+    assert (key, sym) == ((gh.hash, 0) if not symmetric else
+                          gh.canonical_hash())
+  assert moves[False] == moves[True]
+  # the entry of a position is found from its symmetric images
+  gh.do_move(moves[True])
+  for move in [(10, 10), (8, 10)]:
+    gh.do_move(move)
+    agent.alpha_beta_memory((9, 8), 2, True, -np.inf, np.inf)
+    gh.do_move((9, 8))
+    entry = agent.table.probe(agent.table_key()[0])
+    gh.undo_move()
+    gh.undo_move()
+    assert entry is not None and entry.depth == 2
@@ -0,0 +1,64 @@
+import numpy as np
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.mcts import MCTSAgent
+from gomoku.minimax import MiniMaxAgent
+from gomoku.opening_book import OpeningBook, OpeningBookBuilder
+from gomoku.symmetry import SYMMETRIES, canonical_hash, transform
+
+
+def game_handler(moves, sym=0):
+  """Game handler after `moves`, played in the image of the board by sym."""
+  gh = GameHandler(Board(), [MiniMaxAgent(1), MiniMaxAgent(2)])
+  for move in moves:
+    gh.do_move(transform(*move, sym))
+  return gh
+
+
+def test_symmetries():
+  moves = [(9, 9), (8, 9), (7, 12)]
+  keys = set()
+  for sym in SYMMETRIES:
+    assert transform(*transform(3, 5, sym), sym, inverse=True) == (3, 5)
+    gh = game_handler(moves, sym)
+    keys.add(canonical_hash(gh.board, gh.zobrist, gh.hash)[0])
+  assert len(keys) == 1
+  # the side to move is part of the key
+  gh = game_handler(moves[:2])
+  assert canonical_hash(gh.board, gh.zobrist, gh.hash)[0] not in keys
+  # the incremental hashes follow moves, captures and undos
+  gh = game_handler([])
+  gh.track_symmetries()
+  for move in [(9, 9), (9, 10), (8, 8), (9, 11), (9, 12)]:
+    gh.do_move(move)
+    assert gh.canonical_hash() == canonical_hash(gh.board, gh.zobrist,
+                                                 gh.hash)
+  assert gh.capture_history[-1]
+  while gh.move_history:
+    gh.undo_move()
+    assert gh.canonical_hash() == canonical_hash(gh.board, gh.zobrist,
+                                                 gh.hash)
+
+
+def test_book(tmp_path):
+  filename = str(tmp_path / "book.bin")
+  builder = OpeningBookBuilder(plies=3, width=2, depth=2)
+  builder.write(filename)
+  book = OpeningBook(filename)
+  assert len(book) == sum(len(moves) for moves in builder.stats.values())
+  keys = np.array(book.records['key'])
+  assert (keys[:-1] <= keys[1:]).all()
+  gh = game_handler([(9, 9)])
+  move = book.lookup(gh)
+  assert move is not None and gh.board.is_empty(*move)
+  # the book answers every symmetric image of the position
+  for sym in SYMMETRIES:
+    gh = game_handler([(9, 9), move], sym)
+    answer = book.lookup(gh)
+    for agent in [MiniMaxAgent(1), MCTSAgent(1)]:
+      agent.book = book
+      assert agent.find_move(gh) == answer
+    # positions past the book are searched
+    gh.do_move(answer)
+    assert book.lookup(gh) is None
@@ -0,0 +1,47 @@
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.minimax import MiniMaxAgent
+from gomoku.proof_number import ProofNumberSearch
+
+
+def game_handler(filename, color):
+  """Game handler of the board in `filename`, color being to move."""
+  board = Board(filename)
+  gh = GameHandler(board, [MiniMaxAgent(1), MiniMaxAgent(2)])
+  gh.current = color - 1
+  gh.hash = gh.zobrist.hash(board, gh.current, gh.get_player_captures())
+  return gh
+
+
+def test_proofs():
+  gh = game_handler("boards/evals/can_do_four.txt", 1)
+  search = ProofNumberSearch(gh, 1)
+  result, move = search.solve()
+  assert result and move in [(10, 7), (10, 11)]
+  assert (gh.move_history, gh.current) == ([], 0)
+  assert ([player.aligned_five_prev for player in gh.players] ==
+          [False, False])
+  # white has to block the four, then black aligns five with the other end
+  gh = game_handler("boards/evals/four.txt", 2)
+  assert ProofNumberSearch(gh, 2).solve()[0] is False
+
+
+def test_budget():
+  gh = game_handler("boards/expert/must_protect_five.txt", 1)
+  search = ProofNumberSearch(gh, 1, max_nodes=50)
+  result, move = search.solve()
+  assert result is None and move is not None
+  assert search.nodes_searched == 50 and gh.move_history == []
+
+
+def test_child_keys():
+  gh = game_handler("boards/evals/please_capture.txt", 2)
+  search = ProofNumberSearch(gh, 2)
+  assert gh.threats.capturing[2]
+  for move in gh.child_list:
+    key = search.child_key(move)
+    gh.do_move(move)
+    # captures change the hash too
+    assert key == gh.hash == gh.zobrist.hash(gh.board, gh.current,
+                                             gh.get_player_captures())
+    gh.undo_move()
@@ -0,0 +1,65 @@
+import numpy as np
+
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.mcts import MCTSAgent
+from gomoku.minimax import MiniMaxAgent
+from gomoku.solved import LOSS, WIN, SolvedPositions
+from gomoku.symmetry import transform
+
+
+def test_store(tmp_path):
+  filename = str(tmp_path / "solved.bin")
+  solved = SolvedPositions(filename)
+  solved.add(2 ** 63 + 5, WIN, (3, 4))
+  solved.add(7, LOSS)
+  assert solved.lookup(2 ** 63 + 5) == (WIN, (3, 4))
+  assert solved.lookup(7) == (LOSS, None)
+  assert solved.lookup(8) is None
+  # records appended by another process are read on lookup
+  other = SolvedPositions(filename)
+  other.add(9, WIN, (0, 0))
+  assert solved.lookup(9) == (WIN, (0, 0))
+  solved.add(7, WIN, (1, 1))
+  solved.compact()
+  assert len(solved.sorted) == 3 and solved.recent == {}
+  assert list(solved.sorted['key']) == [7, 9, 2 ** 63 + 5]
+  assert solved.lookup(7) == (WIN, (1, 1))
+  assert other.lookup(2 ** 63 + 5) == (WIN, (3, 4))
+  assert len(SolvedPositions(filename)) == 3
+
+
+def image(filename, sym):
+  """Board of the file moved by the symmetry sym."""
+  board, original = Board(), Board(filename)
+  for x, y in zip(*np.nonzero(original.board)):
+    board.place(*transform(int(x), int(y), sym), original.get(x, y))
+  return board
+
+
+def test_agents(tmp_path):
+  solved = SolvedPositions(str(tmp_path / "solved.bin"))
+  for agent in [MiniMaxAgent(1), MCTSAgent(1)]:
+    agent.solved = solved
+    gh = GameHandler(Board("boards/evals/can_do_four.txt"),
+                     [agent, MiniMaxAgent(2)])
+    key, sym = gh.canonical_hash()
+    solved.add(key, WIN, transform(0, 1, sym))
+    assert agent.find_move(gh) == (0, 1)
+  # proven wins are added to the store under the canonical hash
+  solved = SolvedPositions(str(tmp_path / "proven.bin"))
+  agent = MiniMaxAgent(1)
+  agent.solved = solved
+  gh = GameHandler(Board("boards/evals/can_do_four.txt"),
+                   [agent, MiniMaxAgent(2)])
+  move = agent.find_move(gh)
+  key, sym = gh.canonical_hash()
+  assert solved.lookup(key) == (WIN, transform(*move, sym))
+  # and found from the symmetric images of the position, without searching
+  for sym in [3, 5]:
+    for agent in [MiniMaxAgent(1), MCTSAgent(1)]:
+      agent.solved = solved
+      agent.threat_space = agent.proof_number = False
+      gh = GameHandler(image("boards/evals/can_do_four.txt", sym),
+                       [agent, MiniMaxAgent(2)])
+      assert agent.find_move(gh) == transform(*move, sym)
@@ -0,0 +1,64 @@
+from gomoku.board import Board
+from gomoku.game_handler import GameHandler
+from gomoku.minimax import MiniMaxAgent
+from gomoku.rules import Rules
+from gomoku.threat_space import ThreatSpaceSearch
+
+
+def game_handler(board, color):
+  """Game handler of `board`, color being to move."""
+  gh = GameHandler(board, [MiniMaxAgent(1), MiniMaxAgent(2)])
+  gh.current = color - 1
+  return gh
+
+
+def test_fours():
+  gh = game_handler(Board("boards/evals/can_do_four.txt"), 1)
+  search = ThreatSpaceSearch(gh, 1)
+  # the open three becomes an open four
+  assert search.solve() in [(10, 7), (10, 11)]
+  assert gh.move_history == []
+  gh.current = 1
+  assert ThreatSpaceSearch(gh, 2).solve() is None
+  gh = game_handler(Board("boards/evals/protect_five_easy.txt"), 1)
+  assert ThreatSpaceSearch(gh, 1).solve() == (8, 7)
+
+
+def test_captures():
+  board = Board()
+  for y in range(5, 9):
+    board.place(9, y, 1)
+  board.place(9, 4, 2)
+  # white can capture (9, 7) and (10, 7) and break the five
+  board.place(10, 7, 1)
+  board.place(8, 7, 2)
+  gh = game_handler(board, 1)
+  assert ThreatSpaceSearch(gh, 1).solve() != (9, 9)
+  board.remove(8, 7)
+  gh = game_handler(board, 1)
+  assert ThreatSpaceSearch(gh, 1).solve() == (9, 9)
+
+
+def test_defender_five():
+  board = Board()
+  # white four on y = 10, black could capture (5, 10) and (5, 11)
+  for x in range(5, 9):
+    board.place(x, 10, 2)
+  board.place(5, 11, 2)
+  board.place(5, 9, 1)
+  for y in range(11, 14):
+    board.place(9, y, 1)
+  gh = game_handler(board, 1)
+  # the four of black is answered by a five only black can break, after
+  # which white plays the captured stone again
+  assert ThreatSpaceSearch(gh, 1).solve() != (9, 10)
+  gh.do_move((9, 10))
+  gh.do_move((4, 10))
+  assert Rules.check_winner(gh.board, gh.players, gh.threats) is None
+  search = ThreatSpaceSearch(gh, 1)
+  assert search.breaks() == [(5, 12)]
+  move = search.solve()
+  assert move is None or move == (5, 12)
+  # any other move loses, even a five
+  gh.do_move((9, 9))
+  assert Rules.check_winner(gh.board, gh.players, gh.threats).color == 2
@@ -0,0 +1,48 @@
+import numpy as np
+
+from gomoku.transposition import TranspositionTable
+
+
+def test_bounds():
+  table = TranspositionTable(bits=4)
+  table.store(1, 2, 5, 0, 10, (3, 3))
+  entry = table.probe(1)
+  assert (entry.lowerbound, entry.upperbound, entry.move) == (5, 5, (3, 3))
+  # same depth: the new bound narrows the entry
+  table.store(1, 2, 7, 7, 10)
+  assert (entry.lowerbound, entry.upperbound) == (5, 7)
+  table.store(1, 2, 6, 6, 10)
+  assert (entry.lowerbound, entry.upperbound, entry.move) == (5, 6, (3, 3))
+  # a conflicting bound replaces the other one
+  table.store(1, 2, 4, 4, 10)
+  assert (entry.lowerbound, entry.upperbound, entry.move) == (-np.inf, 4,
+                                                              (3, 3))
+  table.store(1, 2, 8, 0, 8)
+  assert (entry.lowerbound, entry.upperbound) == (8, np.inf)
+  assert entry.lowerbound <= entry.upperbound
+  # shallower search: the deeper entry is kept
+  table.store(1, 1, 20, 0, 10, (4, 4))
+  assert (entry.depth, entry.lowerbound, entry.move) == (2, 8, (3, 3))
+  # deeper search: the bounds are replaced
+  table.store(1, 3, 20, 0, 10)
+  assert (entry.depth, entry.lowerbound, entry.upperbound) == (3, 20, np.inf)
+  assert table.probe(2) is None
+
+
+def test_replacement():
+  table = TranspositionTable(bits=4)
+  # keys 1, 17 and 33 share bucket 1
+  table.store(1, 5, 0, -1, 1)
+  table.store(17, 2, 0, -1, 1)
+  assert table.deep[1].key == 1 and table.recent[1].key == 17
+  table.store(33, 3, 0, -1, 1)
+  assert table.deep[1].key == 1 and table.recent[1].key == 33
+  assert table.probe(17) is None
+  # entries of a previous search lose their depth priority
+  table.new_search()
+  table.store(17, 1, 0, -1, 1)
+  assert table.deep[1].key == 17 and table.recent[1].key == 1
+  assert len(table) == 2
+  for key in range(100):
+    table.store(key, 1, 0, -1, 1)
+  assert len(table) <= 2 * 16